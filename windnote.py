@@ -14,19 +14,38 @@ Features:
 - Automatically detects and uses system proxy on Windows for downloading web drivers.
 
 To use this script, please install the required libraries:
-pip install PyQt6 PyQt6-WebEngine requests beautifulsoup4 markdownify pypandoc python-docx markdown selenium webdriver-manager
+pip install PyQt6 PyQt6-WebEngine requests lxml pypandoc python-docx markdown-it-py selenium webdriver-manager brotli
+Optionally install orjson for faster metadata and config writes.
 """
 import sys
 import os
 import re
 import json
+import errno
+import bisect
 import shutil
+import subprocess
 import requests
-import pypandoc
-import markdown
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import hashlib
+import importlib
+import tempfile
 import time
+import threading
+import queue
+import zipfile
+from collections import OrderedDict
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse, parse_qs
+from urllib.parse import urljoin, urlparse, parse_qs
+from xml.sax.saxutils import escape
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 if sys.platform == 'win32':
     import winreg
@@ -35,33 +54,66 @@ from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTextEdit, QPushButton, QFileDialog, QMessageBox, QInputDialog,
     QSplitter, QLabel, QFrame, QTreeWidget, QTreeWidgetItem, QMenu,
-    QDialog, QFormLayout, QComboBox, QCheckBox, QLineEdit, QColorDialog
+    QDialog, QFormLayout, QComboBox, QCheckBox, QLineEdit, QColorDialog,
+    QStyledItemDelegate, QStyleOptionViewItem, QStyle, QTreeWidgetItemIterator
 )
 from PyQt6.QtGui import (
-    QFont, QAction, QActionGroup, QDrag, QIcon, QShortcut,
-    QKeySequence, QTextCharFormat, QColor
+    QFont, QAction, QActionGroup, QDrag, QShortcut,
+    QKeySequence, QTextCharFormat, QColor, QPalette, QFontMetrics
 )
-from PyQt6.QtCore import Qt, QUrl, QMimeData, QCoreApplication
+from PyQt6.QtCore import Qt, QUrl, QSize, QRect, QMimeData, QCoreApplication, QTimer, QThread, QMutex, QMutexLocker, QFileSystemWatcher, pyqtSignal
 
 from PyQt6.QtWebEngineWidgets import QWebEngineView
 
-from bs4 import BeautifulSoup
-from markdownify import markdownify as md
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.edge.service import Service as EdgeService
-from selenium.common.exceptions import WebDriverException, InvalidSessionIdException
-
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+from lxml import html as lxml_html
+from markdown_it import MarkdownIt
 
 CONFIG_FILE = "config.json"
 DEFAULT_NOTES_DIR = "MyNotes"
 DEFAULT_IMAGES_DIR = "MyNotes/images"
 DRIVER_DIR = "drivers"
+REFERENCE_DOCX_DIR = "reference_docs"
+REFERENCE_TEMPLATE_DOCX = "reference_template.docx"
+REFERENCE_CN_FONT_PLACEHOLDER = "WindnoteChineseFont"
+REFERENCE_EN_FONT_PLACEHOLDER = "WindnoteEnglishFont"
+PANDOC_INPUT_FORMATS = ('commonmark_x', 'markdown')
+# pandoc writer each PDF engine consumes: LaTeX engines take latex, HTML-based ones take html.
+PDF_ENGINES = {'xelatex': 'latex', 'tectonic': 'latex', 'weasyprint': 'html'}
+PANDOC_RTS_ARGS = ('+RTS', '-M512M', '-RTS')
 CHROME_DRIVER_PATH = os.path.join(DRIVER_DIR, "chromedriver.exe")
 EDGE_DRIVER_PATH = os.path.join(DRIVER_DIR, "msedgedriver.exe")
+_SEP = os.sep
+# Directory mtimes can be as coarse as 2 s (FAT/exFAT), so a listing taken that close to the mtime is not trusted.
+DIR_MTIME_RACY_NS = 2_000_000_000
+SKIPPED_FOLDERS = ("images", "app_edge_profile", "app_chrome_profile", "drivers")
+URL_IMPORT_WORKERS = 8
+IMAGE_DOWNLOAD_WORKERS = 8
+TITLE_XPATHS = ('(//h1)[1]', '(//h2[contains(concat(" ", normalize-space(@class), " "), " rich_media_title ")])[1]')
+CONTENT_XPATHS = ('(//div[@id="js_content"])[1]', '(//article)[1]', '(//main)[1]', '//body')
+SCRAPE_ARTICLE_JS = (
+    "var title = document.querySelector('h1') || document.querySelector('h2.rich_media_title');"
+    "var content = document.getElementById('js_content') || document.querySelector('article')"
+    " || document.querySelector('main') || document.body;"
+    "return [title ? title.textContent : '', content ? content.outerHTML : null];"
+)
+SUMMARY_NEWLINES = str.maketrans('\r\n', '  ')
+TITLE_INVALID_CHARS = str.maketrans('', '', '\\/*?:"<>|')
+BROWSER_BACKENDS = {
+    'Chrome': {'driver_manager': 'webdriver_manager.chrome.ChromeDriverManager',
+               'service': 'selenium.webdriver.chrome.service.Service', 'options': 'selenium.webdriver.ChromeOptions',
+               'webdriver': 'selenium.webdriver.Chrome', 'local_driver_path': CHROME_DRIVER_PATH,
+               'driver_exe': 'chromedriver.exe',
+               'check_version_url': "chrome://settings/help",
+               'driver_download_url': "https://googlechromelabs.github.io/chrome-for-testing/",
+               'profile_dir': "app_chrome_profile"},
+    'Edge': {'driver_manager': 'webdriver_manager.microsoft.EdgeChromiumDriverManager',
+             'service': 'selenium.webdriver.edge.service.Service', 'options': 'selenium.webdriver.EdgeOptions',
+             'webdriver': 'selenium.webdriver.Edge', 'local_driver_path': EDGE_DRIVER_PATH,
+             'driver_exe': 'msedgedriver.exe',
+             'check_version_url': "edge://settings/help",
+             'driver_download_url': "https://developer.microsoft.com/en-us/microsoft-edge/tools/webdriver/",
+             'profile_dir': "app_edge_profile"},
+}
 
 TRANSLATIONS = {
     "window_title": {"中文": "Windnote", "English": "Python Note & Article Organizer"},
@@ -70,6 +122,7 @@ TRANSLATIONS = {
     "import_url_quick": {"中文": "从URL导入 (快速)", "English": "From URL (Quick)"},
     "import_browser_advanced": {"中文": "从浏览器导入 (高级)", "English": "From Browser (Advanced)"},
     "export_as_menu": {"中文": "导出为", "English": "Export As"},
+    "cancel_export": {"中文": "取消导出", "English": "Cancel Export"},
     "settings_menu": {"中文": "设置", "English": "Settings"},
     "set_image_folder": {"中文": "设置图片文件夹", "English": "Set Image Folder"},
     "font_settings": {"中文": "字体设置", "English": "Font Settings"},
@@ -78,6 +131,8 @@ TRANSLATIONS = {
     "select_browser_menu": {"中文": "选择浏览器", "English": "Select Browser"},
     "theme_menu": {"中文": "主题", "English": "Theme"},
     "language_menu": {"中文": "语言", "English": "Language"},
+    "pandoc_input_format_menu": {"中文": "导出源格式", "English": "Export Source Format"},
+    "pdf_engine_menu": {"中文": "PDF 引擎", "English": "PDF Engine"},
     "search_placeholder": {"中文": "在此输入以进行搜索...", "English": "Search here..."},
     "filter_all_notes": {"中文": "所有笔记", "English": "All Notes"},
     "filter_favorites_only": {"中文": "只看收藏", "English": "Favorites Only"},
@@ -95,7 +150,9 @@ TRANSLATIONS = {
     "import_success": {"中文": "文章 '{title}' 已成功导入！",
                        "English": "Article '{title}' has been imported successfully!"},
     "import_url_dialog_title": {"中文": "导入笔记 (快速)", "English": "Import Note (Quick)"},
-    "import_url_dialog_label": {"中文": "请输入网页链接:", "English": "Enter a web page URL:"},
+    "import_url_dialog_label": {"中文": "请输入网页链接 (每行一个):", "English": "Enter web page URLs (one per line):"},
+    "import_batch_success": {"中文": "已成功导入 {count} 篇文章！",
+                             "English": "{count} articles have been imported successfully!"},
     "import_failed": {"中文": "导入失败", "English": "Import Failed"},
     "error": {"中文": "错误", "English": "Error"},
     "same_name_exists": {"中文": "同名笔记已存在于当前文件夹。",
@@ -106,8 +163,12 @@ TRANSLATIONS = {
     "all_files": {"中文": "所有文件", "English": "All Files"},
     "export_success": {"中文": "笔记已成功导出到:\n{path}", "English": "Note exported successfully to:\n{path}"},
     "export_failed": {"中文": "导出失败", "English": "Export Failed"},
+    "export_timeout": {"中文": "Pandoc 在 {timeout} 秒内未完成转换，已终止。",
+                       "English": "Pandoc did not finish within {timeout} seconds and was stopped."},
     "export_pandoc_error": {"中文": "导出时发生错误: {e}\n\n请确保已正确安装 Pandoc。",
                             "English": "An error occurred during export: {e}\n\nPlease ensure Pandoc is installed correctly."},
+    "missing_dependency": {"中文": "缺少依赖库 {module}，请通过 pip 安装后重试。",
+                           "English": "The {module} library is missing. Please install it via pip and try again."},
     "select_image_folder_title": {"中文": "选择图片存储文件夹", "English": "Select Image Storage Folder"},
     "image_folder_updated": {"中文": "新图片的存储文件夹已更新为:\n{dir_name}",
                              "English": "Image storage folder updated to:\n{dir_name}"},
@@ -192,7 +253,249 @@ TRANSLATIONS = {
 }
 
 
+_TR_FALLBACK = {key: texts.get('English', f'<{key}>') for key, texts in TRANSLATIONS.items()}
+
+
+def make_tr(lang):
+    table = {key: texts.get(lang) or _TR_FALLBACK[key] for key, texts in TRANSLATIONS.items()}
+
+    def tr(key, **kwargs):
+        template = table.get(key)
+        if template is None: template = f'<{key}>'
+        return template.format_map(kwargs) if kwargs else template
+
+    return tr
+
+
+_CHARSET_RE = re.compile(r'charset=["\']?([\w.:-]+)', re.I)
+
+
+def parse_html_document(html, base_url=None, encoding=None):
+    parser = None
+    if encoding:
+        # A bogus header charset falls back to lxml's own encoding detection.
+        try:
+            parser = lxml_html.HTMLParser(encoding=encoding)
+        except LookupError:
+            pass
+    try:
+        return lxml_html.document_fromstring(html, parser=parser, base_url=base_url)
+    except ValueError:
+        return lxml_html.document_fromstring(html.encode('utf-8'), base_url=base_url)
+
+
+def first_match(tree, xpaths):
+    for xpath in xpaths:
+        found = tree.xpath(xpath)
+        if found: return found[0]
+    return None
+
+
+_MD_WHITESPACE_RE = re.compile(r'\s+')
+_MD_BLANK_LINES_RE = re.compile(r'[ \t]*\n(?:[ \t]*\n)+')
+_MD_CODE_LANG_RE = re.compile(r'(?:lang|language)-(\S+)')
+_MD_ESCAPES = str.maketrans({'*': '\\*', '_': '\\_'})
+
+
+def _md_text(text):
+    return _MD_WHITESPACE_RE.sub(' ', text).translate(_MD_ESCAPES)
+
+
+def _md_raw_text(el):
+    parts = [el.text or '']
+    for child in el:
+        if child.tag == 'br':
+            parts.append('\n')
+        elif isinstance(child.tag, str):
+            parts.append(_md_raw_text(child))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _md_children(el):
+    parts = [_md_text(el.text)] if el.text else []
+    for child in el:
+        if isinstance(child.tag, str):
+            parts.append(_MD_HANDLERS.get(child.tag, _md_children)(child))
+        if child.tail: parts.append(_md_text(child.tail))
+    # Whitespace between block elements is not content; drop it so blocks start at column 0.
+    for i in range(len(parts)):
+        if i and parts[i - 1].endswith('\n'): parts[i] = parts[i].lstrip(' ')
+        if i + 1 < len(parts) and parts[i + 1].startswith('\n'): parts[i] = parts[i].rstrip(' ')
+    return ''.join(parts)
+
+
+def _md_block_body(el):
+    return _MD_BLANK_LINES_RE.sub('\n\n', _md_children(el)).strip()
+
+
+def _md_wrap(text, opening, closing):
+    stripped = text.strip()
+    if not stripped: return text
+    start = text.index(stripped[0])
+    return f"{text[:start]}{opening}{stripped}{closing}{text[start + len(stripped):]}"
+
+
+def _md_block(el):
+    body = _md_block_body(el)
+    return f"\n\n{body}\n\n" if body else ''
+
+
+def _md_heading(el):
+    text = ' '.join(_md_children(el).split())
+    return f"\n\n{'#' * int(el.tag[1])} {text}\n\n" if text else ''
+
+
+def _md_pre(el):
+    code = el.find('code')
+    lang = _MD_CODE_LANG_RE.search((code if code is not None else el).get('class', ''))
+    text = _md_raw_text(el).strip('\n')
+    fence = '~~~~' if '```' in text else '```'
+    return f"\n\n{fence}{lang.group(1) if lang else ''}\n{text}\n{fence}\n\n"
+
+
+def _md_code(el):
+    text = _md_raw_text(el).replace('\n', ' ')
+    if not text.strip(): return text
+    fence = '``' if '`' in text else '`'
+    return f"{fence}{text}{fence}"
+
+
+def _md_link(el):
+    text = _md_children(el)
+    href = el.get('href')
+    if not href: return text
+    title = el.get('title')
+    title = ' "{}"'.format(title.replace('"', '\\"')) if title else ''
+    return _md_wrap(text, '[', f"]({href.replace(' ', '%20')}{title})")
+
+
+def _md_image(el):
+    src = el.get('src') or el.get('data-src')
+    return f"![{el.get('alt', '')}]({src})" if src else ''
+
+
+def _md_list(el):
+    ordered = el.tag == 'ol'
+    start = int(el.get('start')) if ordered and (el.get('start') or '').isdigit() else 1
+    items = []
+    for li in el:
+        if li.tag != 'li': continue
+        bullet = f"{start + len(items)}. " if ordered else '* '
+        items.append(bullet + _md_block_body(li).replace('\n', '\n' + ' ' * len(bullet)))
+    return '\n\n' + '\n'.join(items) + '\n\n' if items else ''
+
+
+def _md_blockquote(el):
+    body = _md_block_body(el)
+    if not body: return ''
+    return '\n\n' + '\n'.join(f"> {line}" if line else '>' for line in body.split('\n')) + '\n\n'
+
+
+def _md_cell(el):
+    return ' '.join(_md_children(el).split()).replace('|', '\\|')
+
+
+def _md_table(el):
+    rows = []
+    for tr in el.iter('tr'):
+        cells = [_md_cell(cell) for cell in tr if cell.tag in ('td', 'th')]
+        if cells: rows.append(cells)
+    if not rows: return ''
+    width = max(len(cells) for cells in rows)
+    lines = []
+    for cells in rows:
+        lines.append('| ' + ' | '.join(cells + [''] * (width - len(cells))) + ' |')
+        if len(lines) == 1: lines.append('| ' + ' | '.join(['---'] * width) + ' |')
+    return '\n\n' + '\n'.join(lines) + '\n\n'
+
+
+_MD_HANDLERS = {
+    **{tag: _md_heading for tag in ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')},
+    **{tag: _md_block for tag in ('p', 'div', 'section', 'article', 'main', 'header', 'footer', 'aside', 'nav',
+                                  'figure', 'figcaption', 'center', 'address', 'details', 'summary', 'dl', 'dt',
+                                  'dd', 'form', 'fieldset', 'body', 'html')},
+    **{tag: lambda el: '' for tag in ('script', 'style', 'noscript', 'head', 'template', 'iframe')},
+    **{tag: lambda el: _md_wrap(_md_children(el), '**', '**') for tag in ('strong', 'b')},
+    **{tag: lambda el: _md_wrap(_md_children(el), '*', '*') for tag in ('em', 'i')},
+    **{tag: lambda el: _md_wrap(_md_children(el), '~~', '~~') for tag in ('del', 's', 'strike')},
+    'br': lambda el: '  \n',
+    'hr': lambda el: '\n\n---\n\n',
+    'pre': _md_pre,
+    'code': _md_code,
+    'a': _md_link,
+    'img': _md_image,
+    'ul': _md_list,
+    'ol': _md_list,
+    'blockquote': _md_blockquote,
+    'table': _md_table,
+}
+
+
+def lxml_to_markdown(el):
+    return _MD_BLANK_LINES_RE.sub('\n\n', _MD_HANDLERS.get(el.tag, _md_children)(el)).strip()
+
+
+MARKDOWN_RENDERER = MarkdownIt('commonmark', {'html': True}).enable('table')
+_RENDER_CACHE = OrderedDict()
+_RENDER_CACHE_SIZE = 64
+
+
+def render_markdown(text):
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+    html = _RENDER_CACHE.get(digest)
+    if html is None:
+        html = MARKDOWN_RENDERER.render(text)
+        _RENDER_CACHE[digest] = html
+        if len(_RENDER_CACHE) > _RENDER_CACHE_SIZE: _RENDER_CACHE.popitem(last=False)
+    else:
+        _RENDER_CACHE.move_to_end(digest)
+    return html
+
+
+def read_json(path):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def write_reference_docx(template_path, path, cn_font, en_font):
+    with zipfile.ZipFile(template_path) as src, zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as dst:
+        for info in src.infolist():
+            data = src.read(info)
+            if info.filename == 'word/styles.xml':
+                data = data.replace(REFERENCE_CN_FONT_PLACEHOLDER.encode(), escape(cn_font, {'"': '&quot;'}).encode('utf-8'))
+                data = data.replace(REFERENCE_EN_FONT_PLACEHOLDER.encode(), escape(en_font, {'"': '&quot;'}).encode('utf-8'))
+            dst.writestr(info, data)
+    return True
+
+
+def write_json_atomic(path, data, fsync=False):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        if orjson:
+            f.write(orjson.dumps(data))
+        else:
+            f.write(json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+_PROXY_CACHE = None
+_PROXY_CACHED = False
+
+
 def get_system_proxy():
+    global _PROXY_CACHE, _PROXY_CACHED
+    if not _PROXY_CACHED:
+        _PROXY_CACHE = _read_system_proxy()
+        _PROXY_CACHED = True
+    return _PROXY_CACHE
+
+
+def _read_system_proxy():
     if sys.platform != 'win32':
         return None
     try:
@@ -217,37 +520,83 @@ def get_system_proxy():
 
 THEMES = {
     "Default Light": {
-        "style": "QTreeWidget::item:selected { background-color: #dbeafe; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #1f2937; }"},
+        "style": "QTreeWidget::item:selected { background-color: #dbeafe; color: #1f2937; }",
+        "selected_color": "#1f2937"},
     "Dark": {
-        "style": "QWidget { background-color: #2d2d2d; color: #f0f0f0; } QTreeWidget, QTextEdit, QWebEngineView { background-color: #252525; border: 1px solid #444;} QMenuBar, QMenu { background-color: #2d2d2d; color: #f0f0f0; } QMenuBar::item:selected, QMenu::item:selected { background-color: #4a4a4a; } QPushButton { background-color: #4a4a4a; border: 1px solid #555; padding: 5px; } QPushButton:hover { background-color: #5a5a5a; } QLineEdit, QComboBox { background-color: #4a4a4a; padding: 3px; border: 1px solid #555; } QSplitter::handle { background-color: #444; } QLabel { color: #f0f0f0; } NoteItemWidget QLabel[summary_label=\"true\"] { color: #a0a0a0; } NoteItemWidget QLabel[dates_label=\"true\"] { color: #888; } QTreeWidget::item:selected { background-color: #4a4a4a; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #f0f0f0; }"},
+        "style": "QWidget { background-color: #2d2d2d; color: #f0f0f0; } QTreeWidget, QTextEdit, QWebEngineView { background-color: #252525; border: 1px solid #444;} QMenuBar, QMenu { background-color: #2d2d2d; color: #f0f0f0; } QMenuBar::item:selected, QMenu::item:selected { background-color: #4a4a4a; } QPushButton { background-color: #4a4a4a; border: 1px solid #555; padding: 5px; } QPushButton:hover { background-color: #5a5a5a; } QLineEdit, QComboBox { background-color: #4a4a4a; padding: 3px; border: 1px solid #555; } QSplitter::handle { background-color: #444; } QLabel { color: #f0f0f0; } QTreeWidget::item:selected { background-color: #4a4a4a; color: #f0f0f0; }",
+        "selected_color": "#f0f0f0", "summary_color": "#a0a0a0", "dates_color": "#888"},
     "Light Blue": {
-        "style": "QWidget { background-color: #eaf2f8; color: #333; } QMenu::item:selected { background-color: #cce0ff; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #cce0ff; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #1f2937; }"},
+        "style": "QWidget { background-color: #eaf2f8; color: #333; } QMenu::item:selected { background-color: #cce0ff; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #cce0ff; color: #1f2937; }",
+        "selected_color": "#1f2937"},
     "Green": {
-        "style": "QWidget { background-color: #e8f8f5; color: #333; } QMenu::item:selected { background-color: #cceee8; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #cceee8; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #1f2937; }"},
+        "style": "QWidget { background-color: #e8f8f5; color: #333; } QMenu::item:selected { background-color: #cceee8; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #cceee8; color: #1f2937; }",
+        "selected_color": "#1f2937"},
     "Yellow": {
-        "style": "QWidget { background-color: #fef9e7; color: #333; } QMenu::item:selected { background-color: #fcf2d4; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #fcf2d4; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #1f2937; }"},
+        "style": "QWidget { background-color: #fef9e7; color: #333; } QMenu::item:selected { background-color: #fcf2d4; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; } QTreeWidget::item:selected { background-color: #fcf2d4; color: #1f2937; }",
+        "selected_color": "#1f2937"},
     "Newspaper": {
-        "style": "QWidget { background-color: #fdf5e6; color: #4a3c2a; } QTextEdit, QWebEngineView { background-color: #faf0e0; border: 1px solid #dcd2bf; } QMenu::item:selected { background-color: #f2e8d9; } QLineEdit, QComboBox { border: 1px solid #dcd2bf; padding: 2px; background-color: #faf0e0; } QTreeWidget::item:selected { background-color: #f2e8d9; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #4a3c2a; }"},
+        "style": "QWidget { background-color: #fdf5e6; color: #4a3c2a; } QTextEdit, QWebEngineView { background-color: #faf0e0; border: 1px solid #dcd2bf; } QMenu::item:selected { background-color: #f2e8d9; } QLineEdit, QComboBox { border: 1px solid #dcd2bf; padding: 2px; background-color: #faf0e0; } QTreeWidget::item:selected { background-color: #f2e8d9; color: #4a3c2a; }",
+        "selected_color": "#4a3c2a"},
     "Cyberpunk": {
-        "style": "QWidget { background-color: #0d0221; color: #00f0c0; } QTreeWidget, QTextEdit, QWebEngineView { background-color: #000; border: 1px solid #ff00ff;} QPushButton { background-color: #240046; color: #00f0c0; border: 1px solid #ff00ff; } QMenu::item:selected { background-color: #5a0094; } QLineEdit, QComboBox { background-color: #240046; color: #00f0c0; border: 1px solid #ff00ff; padding: 3px; } QLabel { color: #00f0c0; } NoteItemWidget QLabel[summary_label=\"true\"] { color: #9a9a9a; } NoteItemWidget QLabel[dates_label=\"true\"] { color: #666; } QTreeWidget::item:selected { background-color: #5a0094; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #e0e0e0; }"},
+        "style": "QWidget { background-color: #0d0221; color: #00f0c0; } QTreeWidget, QTextEdit, QWebEngineView { background-color: #000; border: 1px solid #ff00ff;} QPushButton { background-color: #240046; color: #00f0c0; border: 1px solid #ff00ff; } QMenu::item:selected { background-color: #5a0094; } QLineEdit, QComboBox { background-color: #240046; color: #00f0c0; border: 1px solid #ff00ff; padding: 3px; } QLabel { color: #00f0c0; } QTreeWidget::item:selected { background-color: #5a0094; color: #e0e0e0; }",
+        "selected_color": "#e0e0e0", "summary_color": "#9a9a9a", "dates_color": "#666"},
     "Letter": {
-        "style": "QWidget { background-color: #f5f5dc; color: #5b4636; } QMenu::item:selected { background-color: #e9e9d0; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; background-color: #f5f5dc; } QTreeWidget::item:selected { background-color: #e9e9d0; } QTreeWidget::item:selected QLabel, QTreeWidget::item:selected QLabel[summary_label=\"true\"], QTreeWidget::item:selected QLabel[dates_label=\"true\"] { background-color: transparent; color: #5b4636; }"},
+        "style": "QWidget { background-color: #f5f5dc; color: #5b4636; } QMenu::item:selected { background-color: #e9e9d0; } QLineEdit, QComboBox { border: 1px solid #c0c0c0; padding: 2px; background-color: #f5f5dc; } QTreeWidget::item:selected { background-color: #e9e9d0; color: #5b4636; }",
+        "selected_color": "#5b4636"},
 }
+THEME_STYLES = {name: theme_data.get("style", "") for name, theme_data in THEMES.items()}
+
+
+def import_object(dotted_path):
+    module_name, _, name = dotted_path.rpartition('.')
+    return getattr(importlib.import_module(module_name), name)
+
+
+def make_proxy_http_client(proxies):
+    from webdriver_manager.core.http import WDMHttpClient
+
+    class ProxyHttpClient(WDMHttpClient):
+        def __init__(self, proxies):
+            super().__init__()
+            self.proxies = proxies
+            self.session = requests.Session()
+
+        def get(self, url, **kwargs):
+            try:
+                resp = self.session.get(url, verify=self._ssl_verify, stream=True, proxies=self.proxies, **kwargs)
+            except requests.exceptions.ConnectionError:
+                raise requests.exceptions.ConnectionError("Could not reach host. Are you offline?")
+            self.validate_response(resp)
+            return resp
+
+    return ProxyHttpClient(proxies)
 
 
 class SeleniumManager:
     def __init__(self, config):
         self.config = config
-        self.driver = None
+        self.tr = make_tr(config.get('language', '中文'))
+        self._driver_lock = QMutex()
+        self._driver = None
         self.base_converter = BaseConverter(config['images_dir'])
         self.main_window = None
 
-    def tr(self, key, **kwargs):
-        lang = self.config.get('language', '中文')
-        template = TRANSLATIONS.get(key, {}).get(lang, TRANSLATIONS.get(key, {}).get('English', f'<{key}>'))
-        return template.format(**kwargs)
+    @property
+    def driver(self):
+        with QMutexLocker(self._driver_lock):
+            return self._driver
+
+    @driver.setter
+    def driver(self, driver):
+        with QMutexLocker(self._driver_lock):
+            self._driver = driver
 
-    def launch_or_get_browser(self):
+    def launch_or_get_browser(self, on_fallback=None):
+        try:
+            from selenium.common.exceptions import WebDriverException, InvalidSessionIdException
+            from webdriver_manager.core.download_manager import WDMDownloadManager
+        except ImportError as e:
+            return self.tr('missing_dependency', module=e.name)
         if self.driver:
             try:
                 _ = self.driver.window_handles
@@ -257,93 +606,62 @@ class SeleniumManager:
                 print("Old browser instance detected as closed. Launching a new one.")
                 self.driver = None
 
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        proxies = get_system_proxy()
-        original_proxies = {}
-        if proxies:
-            print(f"Applying system proxy: {proxies['http']}")
-            for key, value in proxies.items():
-                original_proxies[key.upper()] = os.environ.get(key.upper())
-                os.environ[key.upper()] = value
         try:
+            proxies = get_system_proxy()
+            download_manager = None
+            if proxies:
+                print(f"Applying system proxy: {proxies['http']}")
+                download_manager = WDMDownloadManager(make_proxy_http_client(proxies))
             browser_choice = self.config.get('browser', 'Chrome')
-            service = None
+            backend = BROWSER_BACKENDS.get(browser_choice, BROWSER_BACKENDS['Chrome'])
             try:
                 print(f"Attempting to get {browser_choice} driver online...")
-                if browser_choice == 'Edge':
-                    driver_path = EdgeChromiumDriverManager().install()
-                    service = EdgeService(executable_path=driver_path)
-                    options = webdriver.EdgeOptions()
-                else:
-                    driver_path = ChromeDriverManager().install()
-                    service = ChromeService(executable_path=driver_path)
-                    options = webdriver.ChromeOptions()
+                driver_path = import_object(backend['driver_manager'])(download_manager=download_manager).install()
                 print("Online driver acquired successfully.")
             except Exception as e:
                 print(f"Online driver acquisition failed: {e}")
                 print("Switching to offline fallback mode...")
-                local_driver_path = EDGE_DRIVER_PATH if browser_choice == 'Edge' else CHROME_DRIVER_PATH
-                if os.path.exists(local_driver_path):
-                    if self.main_window:
-                        QMessageBox.warning(self.main_window, self.tr('network_failure'),
-                                            self.tr('driver_fallback_message'))
-                    if browser_choice == 'Edge':
-                        service = EdgeService(executable_path=local_driver_path)
-                        options = webdriver.EdgeOptions()
-                    else:
-                        service = ChromeService(executable_path=local_driver_path)
-                        options = webdriver.ChromeOptions()
-                else:
-                    if browser_choice == 'Edge':
-                        check_version_url = "edge://settings/help"
-                        driver_download_url = "https://developer.microsoft.com/en-us/microsoft-edge/tools/webdriver/"
-                        driver_exe = 'msedgedriver.exe'
-                    else:
-                        check_version_url = "chrome://settings/help"
-                        driver_download_url = "https://googlechromelabs.github.io/chrome-for-testing/"
-                        driver_exe = 'chromedriver.exe'
-
+                driver_path = backend['local_driver_path']
+                if not os.path.exists(driver_path):
                     error_message = (f"{self.tr('driver_failed_title')}"
                                      f"{self.tr('driver_failed_desc')}"
                                      f"{self.tr('driver_failed_manual_steps')}"
                                      f"<ol>"
-                                     f"<li>{self.tr('driver_failed_step1_title', browser_choice=browser_choice)}{self.tr('driver_failed_step1_desc', check_version_url=check_version_url)}</li>"
-                                     f"<li>{self.tr('driver_failed_step2_title')}{self.tr('driver_failed_step2_desc', driver_download_url=driver_download_url)}</li>"
-                                     f"<li>{self.tr('driver_failed_step3_title')}{self.tr('driver_failed_step3_desc', driver_exe=driver_exe)}</li>"
+                                     f"<li>{self.tr('driver_failed_step1_title', browser_choice=browser_choice)}{self.tr('driver_failed_step1_desc', check_version_url=backend['check_version_url'])}</li>"
+                                     f"<li>{self.tr('driver_failed_step2_title')}{self.tr('driver_failed_step2_desc', driver_download_url=backend['driver_download_url'])}</li>"
+                                     f"<li>{self.tr('driver_failed_step3_title')}{self.tr('driver_failed_step3_desc', driver_exe=backend['driver_exe'])}</li>"
                                      f"<li>{self.tr('driver_failed_step4_title')}</li>"
                                      f"</ol>")
                     return error_message
+                if on_fallback: on_fallback()
 
-            profile_key = "app_edge_profile" if browser_choice == 'Edge' else "app_chrome_profile"
-            profile_dir = os.path.join(os.getcwd(), profile_key)
+            service = import_object(backend['service'])(executable_path=driver_path)
+            options = import_object(backend['options'])()
+            profile_dir = os.path.join(os.getcwd(), backend['profile_dir'])
             options.add_argument(f"user-data-dir={profile_dir}")
-            if browser_choice == 'Edge':
-                self.driver = webdriver.Edge(service=service, options=options)
-            else:
-                self.driver = webdriver.Chrome(service=service, options=options)
+            self.driver = import_object(backend['webdriver'])(service=service, options=options)
             print(f"Successfully launched a dedicated {browser_choice} instance.")
             return None
         except Exception as e:
             return f"An unknown error occurred while launching the browser: {e}"
-        finally:
-            if proxies:
-                print("Cleaning up temporary proxy settings...")
-                for key in proxies:
-                    env_key = key.upper()
-                    if original_proxies[env_key] is None:
-                        if env_key in os.environ: del os.environ[env_key]
-                    else:
-                        os.environ[env_key] = original_proxies[env_key]
-            QApplication.restoreOverrideCursor()
 
     def scrape_current_page(self):
-        if not self.driver:
+        driver = self.driver
+        if not driver:
             return None, self.tr('browser_not_connected'), None
+        from selenium.common.exceptions import WebDriverException, InvalidSessionIdException, JavascriptException
         try:
-            html = self.driver.page_source
-            url = self.driver.current_url
-            soup = BeautifulSoup(html, 'html.parser')
-            title, content = self.base_converter._process_html(soup, base_url=url)
+            url = driver.current_url
+            try:
+                title, content_html = driver.execute_script(SCRAPE_ARTICLE_JS)
+            except JavascriptException:
+                content_html = None
+            if content_html:
+                content_div = lxml_html.fromstring(content_html, base_url=url)
+                title, content = self.base_converter._convert_content(title, content_div, base_url=url)
+            else:
+                tree = parse_html_document(driver.page_source, base_url=url)
+                title, content = self.base_converter._process_html(tree, base_url=url)
             return title, content, None
         except (WebDriverException, InvalidSessionIdException):
             self.driver = None
@@ -352,9 +670,10 @@ class SeleniumManager:
             return None, f"{self.tr('scrape_failed')}: {e}", None
 
     def quit_browser(self):
-        if self.driver:
+        driver = self.driver
+        if driver:
             try:
-                self.driver.quit()
+                driver.quit()
                 print("Dedicated browser has been closed.")
             except Exception as e:
                 print(f"Error closing browser: {e}")
@@ -362,40 +681,191 @@ class SeleniumManager:
                 self.driver = None
 
 
+class BrowserLaunchWorker(QThread):
+    launch_finished = pyqtSignal(object)
+    fallback_used = pyqtSignal()
+
+    def __init__(self, selenium_manager, parent=None):
+        super().__init__(parent)
+        self.selenium_manager = selenium_manager
+
+    def run(self):
+        try:
+            error = self.selenium_manager.launch_or_get_browser(on_fallback=self.fallback_used.emit)
+        except Exception as e:
+            error = f"An unknown error occurred while launching the browser: {e}"
+        self.launch_finished.emit(error)
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class ExportWorker(QThread):
+    export_finished = pyqtSignal(str, object)
+
+    def __init__(self, source_paths, input_format, to_format, save_path, extra_args, timeout, parent=None):
+        super().__init__(parent)
+        self.source_paths = source_paths
+        self.input_format = input_format
+        self.to_format = to_format
+        self.save_path = save_path
+        self.extra_args = extra_args
+        self.timeout = timeout
+        self._cancelled = threading.Event()
+        self._proc = None
+
+    def cancel(self):
+        self._cancelled.set()
+        proc = self._proc
+        if proc is not None and proc.poll() is None: proc.terminate()
+
+    def run(self):
+        try:
+            import pypandoc
+            args = [pypandoc.get_pandoc_path(), f'--from={self.input_format}', f'--to={self.to_format}',
+                    *self.source_paths, f'--output={self.save_path}', *self.extra_args, *PANDOC_RTS_ARGS]
+            with subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                                  creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)) as proc:
+                self._proc = proc
+                if self._cancelled.is_set(): proc.terminate()
+                try:
+                    _, stderr = proc.communicate(timeout=self.timeout)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.communicate()
+                    raise
+            if self._cancelled.is_set(): raise ExportCancelled()
+            if proc.returncode != 0:
+                raise RuntimeError(stderr.decode('utf-8', errors='replace').strip())
+            self.export_finished.emit(self.save_path, None)
+        except Exception as e:
+            self.export_finished.emit(self.save_path, e)
+
+
+class UrlImportWorker(QThread):
+    url_converted = pyqtSignal(str, object, object, object)
+
+    def __init__(self, converter, urls, parent_dir, parent=None):
+        super().__init__(parent)
+        self.converter = converter
+        self.urls = urls
+        self.parent_dir = parent_dir
+        self._cancelled = threading.Event()
+        self._done = queue.SimpleQueue()
+        self._futures = {}
+
+    def cancel(self):
+        self._cancelled.set()
+        self._done.put(None)
+        for future in list(self._futures): future.cancel()
+
+    def run(self):
+        executor = ThreadPoolExecutor(max_workers=min(URL_IMPORT_WORKERS, len(self.urls)))
+        try:
+            self._futures = {executor.submit(self.converter.convert_from_url, url): url for url in self.urls}
+            for future in self._futures: future.add_done_callback(self._done.put)
+            for _ in self._futures:
+                future = self._done.get()
+                if self._cancelled.is_set(): break
+                self.url_converted.emit(self._futures[future], *future.result())
+        finally:
+            # After cancel() requests already in flight are left to run out their timeouts; their results are dropped.
+            executor.shutdown(wait=not self._cancelled.is_set(), cancel_futures=True)
+
+
 class NoteManager:
     def __init__(self, notes_dir, images_dir, config):
         self.notes_dir = notes_dir
         self.images_dir = images_dir
         self.config = config
+        self.tr = make_tr(config.get('language', '中文'))
         self.metadata_file = os.path.join(self.notes_dir, "metadata.json")
+        self._notes_dir_abs = os.path.abspath(notes_dir)
+        self._relpath_cache = {}
         os.makedirs(self.notes_dir, exist_ok=True)
         os.makedirs(self.images_dir, exist_ok=True)
         os.makedirs(DRIVER_DIR, exist_ok=True)
         self.metadata = self._load_metadata()
-
-    def tr(self, key, **kwargs):
-        lang = self.config.get('language', '中文')
-        template = TRANSLATIONS.get(key, {}).get(lang, TRANSLATIONS.get(key, {}).get('English', f'<{key}>'))
-        return template.format(**kwargs)
+        self._sorted_keys = sorted(self.metadata)
+        self._stat_dates_cache = {}
+        self._meta_dirty = False
+        self._meta_timer = QTimer()
+        self._meta_timer.setSingleShot(True)
+        self._meta_timer.setInterval(500)
+        self._meta_timer.timeout.connect(self.flush_metadata)
 
     def _load_metadata(self):
         if os.path.exists(self.metadata_file):
-            with open(self.metadata_file, 'r', encoding='utf-8') as f:
-                try:
-                    return json.load(f)
-                except json.JSONDecodeError:
-                    return {}
+            try:
+                return read_json(self.metadata_file)
+            except json.JSONDecodeError:
+                return {}
         return {}
 
     def _save_metadata(self):
-        with open(self.metadata_file, 'w', encoding='utf-8') as f:
-            json.dump(self.metadata, f, ensure_ascii=False, indent=4)
-
-    def get_item_metadata(self, path):
-        rel_path = os.path.relpath(path, self.notes_dir).replace('\\', '/')
+        self._meta_dirty = True
+        self._meta_timer.start()
+
+    def flush_metadata(self):
+        self._meta_timer.stop()
+        if not self._meta_dirty: return
+        write_json_atomic(self.metadata_file, self.metadata)
+        self._meta_dirty = False
+
+    def _subtree_range(self, rel_path):
+        prefix = rel_path + '/'
+        start = end = bisect.bisect_left(self._sorted_keys, prefix)
+        while end < len(self._sorted_keys) and self._sorted_keys[end].startswith(prefix): end += 1
+        return start, end
+
+    def _drop_key(self, rel_path):
+        if rel_path in self.metadata:
+            del self.metadata[rel_path]
+            del self._sorted_keys[bisect.bisect_left(self._sorted_keys, rel_path)]
+
+    def _move_keys(self, old_rel_path, new_rel_path):
+        start, end = self._subtree_range(old_rel_path)
+        old_keys = self._sorted_keys[start:end]
+        del self._sorted_keys[start:end]
+        if old_rel_path in self.metadata:
+            del self._sorted_keys[bisect.bisect_left(self._sorted_keys, old_rel_path)]
+            old_keys.append(old_rel_path)
+        for p in old_keys:
+            new_p = new_rel_path + p[len(old_rel_path):]
+            # A stale key left by a note deleted outside the app is overwritten, not listed twice.
+            if new_p not in self.metadata: bisect.insort(self._sorted_keys, new_p)
+            self.metadata[new_p] = self.metadata.pop(p)
+
+    def _rel(self, path):
+        rel_path = self._relpath_cache.get(path)
+        if rel_path is None:
+            rel_path = os.path.relpath(path, self._notes_dir_abs)
+            if os.sep != '/': rel_path = rel_path.replace(os.sep, '/')
+            self._relpath_cache[path] = rel_path
+        return rel_path
+
+    def _stat_dates(self, path, st):
+        dates = self._stat_dates_cache.get(path)
+        if dates is None or dates[0] != st.st_mtime_ns:
+            if len(self._stat_dates_cache) >= 4096: self._stat_dates_cache.clear()
+            dates = (st.st_mtime_ns, datetime.fromtimestamp(st.st_ctime).isoformat(),
+                     datetime.fromtimestamp(st.st_mtime).isoformat())
+            self._stat_dates_cache[path] = dates
+        return dates
+
+    def get_item_metadata(self, path, st=None):
+        return self._merged_metadata(self._rel(path), path, st or os.stat(path))
+
+    def get_dir_metadata(self, dir_path, entries):
+        rel_dir = self._rel(dir_path)
+        prefix = '' if rel_dir == '.' else f"{rel_dir}/"
+        return [self._merged_metadata(prefix + entry.name, entry.path, entry.stat()) for entry in entries]
+
+    def _merged_metadata(self, rel_path, path, st):
+        _, created_at, modified_at = self._stat_dates(path, st)
         default_meta = {
-            'created_at': datetime.fromtimestamp(os.path.getctime(path)).isoformat(),
-            'modified_at': datetime.fromtimestamp(os.path.getmtime(path)).isoformat(),
+            'created_at': created_at, 'modified_at': modified_at,
             'summary': '', 'is_pinned': False, 'is_favorite': False
         }
         meta = self.metadata.get(rel_path, {});
@@ -407,38 +877,47 @@ class NoteManager:
             with open(path, 'r', encoding='utf-8') as f: return f.read()
         return ""
 
-    def save_note(self, path, content):
-        rel_path = os.path.relpath(path, self.notes_dir).replace('\\', '/')
-        if rel_path not in self.metadata:
-            self.metadata[rel_path] = {'created_at': datetime.now().isoformat(), 'is_pinned': False,
-                                       'is_favorite': False}
-        self.metadata[rel_path]['modified_at'] = datetime.now().isoformat()
-        if not self.metadata[rel_path].get('summary'):
-            self.metadata[rel_path]['summary'] = content[:100].replace('\n', ' ') + '...'
-        with open(path, 'w', encoding='utf-8') as f:
+    def save_note(self, path, content, fsync=False):
+        rel_path = self._rel(path)
+        note_meta = self.metadata.get(rel_path)
+        if note_meta is None:
+            note_meta = self.metadata[rel_path] = {'created_at': datetime.now().isoformat(), 'is_pinned': False,
+                                                   'is_favorite': False}
+            bisect.insort(self._sorted_keys, rel_path)
+        note_meta['modified_at'] = datetime.now().isoformat()
+        if not note_meta.get('summary'):
+            summary = content[:100]
+            if '\n' in summary or '\r' in summary: summary = summary.translate(SUMMARY_NEWLINES)
+            note_meta['summary'] = summary + '...'
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
             f.write(content)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
         self._save_metadata()
 
     def update_summary(self, path, summary):
-        rel_path = os.path.relpath(path, self.notes_dir).replace('\\', '/')
+        rel_path = self._rel(path)
         if rel_path in self.metadata:
             self.metadata[rel_path]['summary'] = summary;
             self._save_metadata()
 
     def toggle_pinned(self, path):
-        rel_path = os.path.relpath(path, self.notes_dir).replace('\\', '/')
+        rel_path = self._rel(path)
         if rel_path in self.metadata:
             self.metadata[rel_path]['is_pinned'] = not self.metadata[rel_path].get('is_pinned', False);
             self._save_metadata()
 
     def toggle_favorite(self, path):
-        rel_path = os.path.relpath(path, self.notes_dir).replace('\\', '/')
+        rel_path = self._rel(path)
         if rel_path in self.metadata:
             self.metadata[rel_path]['is_favorite'] = not self.metadata[rel_path].get('is_favorite', False);
             self._save_metadata()
 
     def create_item(self, parent_dir, name, is_folder=False, content=None):
-        path = os.path.join(parent_dir, name)
+        path = f"{parent_dir}{_SEP}{name}"
         if os.path.exists(path): return None
         if is_folder:
             os.makedirs(path)
@@ -448,28 +927,32 @@ class NoteManager:
         return path
 
     def delete_item(self, path):
-        rel_path_prefix = os.path.relpath(path, self.notes_dir).replace('\\', '/')
+        rel_path_prefix = self._rel(path)
         if os.path.isdir(path):
             shutil.rmtree(path)
-            for p in list(self.metadata.keys()):
-                if p.startswith(rel_path_prefix): del self.metadata[p]
+            start, end = self._subtree_range(rel_path_prefix)
+            for p in self._sorted_keys[start:end]: self.metadata.pop(p, None)
+            del self._sorted_keys[start:end]
         else:
             os.remove(path)
-            if rel_path_prefix in self.metadata: del self.metadata[rel_path_prefix]
+        self._drop_key(rel_path_prefix)
+        self._relpath_cache.clear()
         self._save_metadata()
 
     def move_item(self, source_path, dest_dir):
         if not os.path.isdir(dest_dir): return None, self.tr('destination_must_be_folder')
-        dest_path = os.path.join(dest_dir, os.path.basename(source_path))
+        dest_path = f"{dest_dir}{_SEP}{os.path.basename(source_path)}"
         if os.path.exists(dest_path): return None, self.tr('destination_exists')
         try:
-            shutil.move(source_path, dest_path)
-            old_rel_path_prefix = os.path.relpath(source_path, self.notes_dir).replace('\\', '/')
-            new_rel_path_prefix = os.path.relpath(dest_path, self.notes_dir).replace('\\', '/')
-            for p in list(self.metadata.keys()):
-                if p == old_rel_path_prefix or p.startswith(old_rel_path_prefix + os.sep):
-                    new_p = p.replace(old_rel_path_prefix, new_rel_path_prefix, 1)
-                    self.metadata[new_p] = self.metadata.pop(p)
+            try:
+                os.rename(source_path, dest_path)
+            except OSError as e:
+                if e.errno != errno.EXDEV: raise
+                shutil.move(source_path, dest_path)
+            old_rel_path_prefix = self._rel(source_path)
+            new_rel_path_prefix = self._rel(dest_path)
+            self._move_keys(old_rel_path_prefix, new_rel_path_prefix)
+            self._relpath_cache.clear()
             self._save_metadata();
             return dest_path, None
         except Exception as e:
@@ -478,63 +961,123 @@ class NoteManager:
     def rename_item(self, old_path, new_name):
         if not new_name: return None, self.tr('name_cannot_be_empty')
         parent_dir = os.path.dirname(old_path);
-        new_path = os.path.join(parent_dir, new_name)
+        new_path = f"{parent_dir}{_SEP}{new_name}"
         if os.path.exists(new_path): return None, self.tr('rename_exists')
         try:
             os.rename(old_path, new_path)
-            old_rel_path_prefix = os.path.relpath(old_path, self.notes_dir).replace('\\', '/')
-            new_rel_path_prefix = os.path.relpath(new_path, self.notes_dir).replace('\\', '/')
-            for p in list(self.metadata.keys()):
-                if p == old_rel_path_prefix or p.startswith(old_rel_path_prefix + os.sep):
-                    new_p = p.replace(old_rel_path_prefix, new_rel_path_prefix, 1)
-                    self.metadata[new_p] = self.metadata.pop(p)
+            old_rel_path_prefix = self._rel(old_path)
+            new_rel_path_prefix = self._rel(new_path)
+            self._move_keys(old_rel_path_prefix, new_rel_path_prefix)
+            self._relpath_cache.clear()
             self._save_metadata();
             return new_path, None
         except Exception as e:
             return None, self.tr('rename_failed', e=e)
 
 
-class NoteItemWidget(QWidget):
-    def __init__(self, path, metadata, tr_func, parent=None):
+NOTE_DISPLAY_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+class NoteTreeItem(QTreeWidgetItem):
+    sort_rank = ()
+
+    def __lt__(self, other):
+        return self.sort_rank < other.sort_rank
+
+
+class NoteItemDelegate(QStyledItemDelegate):
+    MARGIN_X, MARGIN_Y, SPACING = 8, 6, 3
+
+    def __init__(self, parent=None):
         super().__init__(parent)
-        self.tr = tr_func
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(8, 6, 8, 6)
-        layout.setSpacing(3)
-        top_line_layout = QHBoxLayout()
-        title_text = f"<b>{os.path.basename(os.path.splitext(path)[0])}</b>"
-        self.title_label = QLabel(title_text)
-        self.title_label.setWordWrap(True)
-        icons_text = ""
-        if metadata.get('is_pinned'): icons_text += "📌 "
-        if metadata.get('is_favorite'): icons_text += "⭐"
-        self.icons_label = QLabel(icons_text)
-        self.icons_label.setAlignment(Qt.AlignmentFlag.AlignTop)
-        top_line_layout.addWidget(self.title_label, 1)
-        top_line_layout.addWidget(self.icons_label, 0)
-        summary_text = metadata.get('summary', '...')
-        self.summary_label = QLabel(summary_text)
-        self.summary_label.setProperty("summary_label", True)
-        self.summary_label.setWordWrap(True)
+        self.theme = THEMES['Default Light']
+
+    @staticmethod
+    def display_texts(path, metadata, tr):
+        title = os.path.basename(os.path.splitext(path)[0])
+        icons = ""
+        if metadata.get('is_pinned'): icons += "📌 "
+        if metadata.get('is_favorite'): icons += "⭐"
         try:
             created_date = datetime.fromisoformat(metadata.get('created_at')).strftime('%Y-%m-%d')
             modified_date = datetime.fromisoformat(metadata.get('modified_at')).strftime('%Y-%m-%d')
-            dates_text = f"{self.tr('created_date_label')}: {created_date} | {self.tr('modified_date_label')}: {modified_date}"
+            dates_text = f"{tr('created_date_label')}: {created_date} | {tr('modified_date_label')}: {modified_date}"
         except (ValueError, TypeError):
-            dates_text = self.tr('date_unavailable')
-        self.dates_label = QLabel(dates_text)
-        self.dates_label.setProperty("dates_label", True)
-        layout.addLayout(top_line_layout)
-        layout.addWidget(self.summary_label)
-        layout.addWidget(self.dates_label)
-        self.setLayout(layout)
+            dates_text = tr('date_unavailable')
+        return title, icons, metadata.get('summary', '...'), dates_text
+
+    def sizeHint(self, option, index):
+        size = super().sizeHint(option, index)
+        if index.data(NOTE_DISPLAY_ROLE) is None: return size
+        line = option.fontMetrics.lineSpacing()
+        return QSize(size.width(), 2 * self.MARGIN_Y + 2 * self.SPACING + 4 * line)
+
+    def paint(self, painter, option, index):
+        texts = index.data(NOTE_DISPLAY_ROLE)
+        if texts is None:
+            super().paint(painter, option, index)
+            return
+        title, icons, summary, dates_text = texts
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+        selected = bool(opt.state & QStyle.StateFlag.State_Selected)
+        text_color = opt.palette.color(QPalette.ColorRole.Text)
+        if selected: text_color = QColor(self.theme.get('selected_color', text_color))
+        rect = opt.rect.adjusted(self.MARGIN_X, self.MARGIN_Y, -self.MARGIN_X, -self.MARGIN_Y)
+        metrics = opt.fontMetrics
+        line = metrics.lineSpacing()
+        painter.save()
+        painter.setPen(text_color)
+        title_width = rect.width()
+        if icons:
+            icons_width = metrics.horizontalAdvance(icons)
+            painter.drawText(QRect(rect.right() - icons_width, rect.top(), icons_width, line),
+                             Qt.AlignmentFlag.AlignRight, icons)
+            title_width -= icons_width + self.SPACING
+        title_font = QFont(opt.font)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        painter.drawText(QRect(rect.left(), rect.top(), title_width, line), Qt.AlignmentFlag.AlignLeft,
+                         QFontMetrics(title_font).elidedText(title, Qt.TextElideMode.ElideRight, title_width))
+        painter.setFont(opt.font)
+        top = rect.top() + line + self.SPACING
+        if not selected and 'summary_color' in self.theme: painter.setPen(QColor(self.theme['summary_color']))
+        painter.drawText(QRect(rect.left(), top, rect.width(), 2 * line), Qt.TextFlag.TextWordWrap, summary)
+        top += 2 * line + self.SPACING
+        if not selected and 'dates_color' in self.theme: painter.setPen(QColor(self.theme['dates_color']))
+        painter.drawText(QRect(rect.left(), top, rect.width(), line), Qt.AlignmentFlag.AlignLeft,
+                         metrics.elidedText(dates_text, Qt.TextElideMode.ElideRight, rect.width()))
+        painter.restore()
 
 
 class BaseConverter:
+    session = None
+    image_executor = None
+
     def __init__(self, images_dir):
         self.images_dir = images_dir
         self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            # Includes br only when the brotli package is installed, so every advertised encoding can be decoded.
+            'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,
+            'Accept-Language': 'zh-CN,zh;q=0.9,en;q=0.8'}
+        if BaseConverter.session is None:
+            BaseConverter.session = self._create_session(self.headers)
+            BaseConverter.image_executor = ThreadPoolExecutor(max_workers=IMAGE_DOWNLOAD_WORKERS)
+
+    @staticmethod
+    def _create_session(headers):
+        session = requests.Session()
+        session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=URL_IMPORT_WORKERS + IMAGE_DOWNLOAD_WORKERS,
+                              max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)))
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
 
     def _download_image(self, url):
         try:
@@ -542,48 +1085,56 @@ class BaseConverter:
             qs = parse_qs(parsed_url.query)
             img_format = qs.get('wx_fmt', ['jpeg'])[0] if 'wx_fmt' in qs else url.split('.')[-1].split('?')[0]
             if len(img_format) > 4: img_format = 'jpg'
-            filename = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}.{img_format}"
-            filepath = os.path.join(self.images_dir, filename)
-            img_response = requests.get(url, headers=self.headers, stream=True, timeout=10)
+            img_response = self.session.get(url, stream=True, timeout=(5, 10))
             img_response.raise_for_status()
-            with open(filepath, 'wb') as f:
-                for chunk in img_response.iter_content(1024): f.write(chunk)
+            data = b''.join(img_response.iter_content(131072))
+            filename = f"{hashlib.blake2b(data, digest_size=8).hexdigest()}.{img_format}"
+            filepath = os.path.join(self.images_dir, filename)
+            if not os.path.exists(filepath):
+                tmp_path = f"{filepath}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as f: f.write(data)
+                os.replace(tmp_path, filepath)
             return filename
         except Exception as e:
             print(f"Failed to download image: {url}, Error: {e}");
             return None
 
-    def _process_html(self, soup, base_url=""):
-        title_tag = soup.find('h1') or soup.find('h2', class_='rich_media_title')
-        title = title_tag.get_text(strip=True) if title_tag else "Untitled Article"
-        title = re.sub(r'[\\/*?:"<>|]', "", title)
-        content_div = soup.find('div', id='js_content') or soup.find('article') or soup.find('main') or soup.body
-        if not content_div: raise ValueError("Could not find the main content area of the article.")
-        for img_tag in content_div.find_all('img'):
+    def _process_html(self, tree, base_url=""):
+        title_tag = first_match(tree, TITLE_XPATHS)
+        title = title_tag.text_content() if title_tag is not None else ""
+        return self._convert_content(title, first_match(tree, CONTENT_XPATHS), base_url)
+
+    def _convert_content(self, title, content_div, base_url=""):
+        title = ' '.join(title.split()).translate(TITLE_INVALID_CHARS) or "Untitled Article"
+        if content_div is None: raise ValueError("Could not find the main content area of the article.")
+        if base_url: content_div.make_links_absolute(base_url, handle_failures='ignore')
+        img_tags, img_urls = [], []
+        for img_tag in content_div.iter('img'):
             img_url = img_tag.get('data-src') or img_tag.get('src')
             if not img_url: continue
-            if not img_url.startswith(('http://', 'https://')):
-                from urllib.parse import urljoin
-                img_url = urljoin(base_url, img_url)
-            img_name = self._download_image(img_url)
+            if not img_url.startswith(('http://', 'https://')): img_url = urljoin(base_url, img_url)
+            img_tags.append(img_tag)
+            img_urls.append(img_url)
+        for img_tag, img_name in zip(img_tags, self.image_executor.map(self._download_image, img_urls)):
             if img_name:
-                img_tag.attrs.clear()
-                local_path = os.path.join(os.path.basename(self.images_dir), img_name).replace("\\", "/")
-                img_tag['src'] = local_path;
-                img_tag['alt'] = "image"
-        return title, md(str(content_div), heading_style="ATX", escape_style=True)
+                img_tag.attrib.clear()
+                local_path = f"{os.path.basename(self.images_dir)}/{img_name}"
+                img_tag.set('src', local_path)
+                img_tag.set('alt', "image")
+        return title, lxml_to_markdown(content_div)
 
 
 class RequestsConverter(BaseConverter):
     def convert_from_url(self, url):
         try:
-            response = requests.get(url, headers=self.headers, timeout=15)
+            response = self.session.get(url, timeout=(5, 15))
             response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            title, markdown_content = self._process_html(soup, base_url=url)
+            charset = _CHARSET_RE.search(response.headers.get('Content-Type', ''))
+            tree = parse_html_document(response.content, base_url=url, encoding=charset.group(1) if charset else None)
+            title, markdown_content = self._process_html(tree, base_url=url)
             return title, markdown_content, None
         except Exception as e:
-            return None, f"Conversion failed: {e}", None
+            return None, None, f"Conversion failed: {e}"
 
 
 class AdvancedImportDialog(QDialog):
@@ -618,7 +1169,19 @@ class AdvancedImportDialog(QDialog):
             self.launch_button.setText(self.tr('launch_browser_button'))
 
     def launch_browser(self):
-        error = self.selenium_manager.launch_or_get_browser()
+        self.launch_button.setEnabled(False)
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        worker = self.main_window.browser_launch_worker()
+        worker.fallback_used.connect(self.on_driver_fallback)
+        worker.launch_finished.connect(self.on_browser_launched)
+        if not worker.isRunning(): worker.start()
+
+    def on_driver_fallback(self):
+        QMessageBox.warning(self, self.tr('network_failure'), self.tr('driver_fallback_message'))
+
+    def on_browser_launched(self, error):
+        QApplication.restoreOverrideCursor()
+        self.launch_button.setEnabled(True)
         if error:
             QMessageBox.critical(self, self.tr('launch_failed'), error)
         self.update_ui()
@@ -638,6 +1201,7 @@ class AdvancedImportDialog(QDialog):
         if not path:
             QMessageBox.warning(self, self.tr('error'), self.tr('same_name_exists'))
         else:
+            self.main_window.invalidate_dir_listing(parent_dir)
             self.main_window.load_notes_tree()
             QMessageBox.information(self, self.tr('success'), self.tr('import_success', title=title))
             self.accept()
@@ -649,6 +1213,7 @@ class DraggableTreeWidget(QTreeWidget):
         self.note_manager = note_manager;
         self.main_window = main_window
         self.setDragDropMode(self.DragDropMode.InternalMove);
+        self.setSelectionMode(self.SelectionMode.ExtendedSelection)
         self.setAcceptDrops(True)
         self.setDropIndicatorShown(True)
 
@@ -688,11 +1253,14 @@ class DraggableTreeWidget(QTreeWidget):
             if os.path.dirname(source_path) == dest_dir:
                 event.ignore()
                 return
-            _, error = self.note_manager.move_item(source_path, dest_dir)
+            dest_path, error = self.note_manager.move_item(source_path, dest_dir)
             if error:
                 QMessageBox.warning(self, self.main_window.tr('move_failed'), error)
                 event.ignore()
             else:
+                self.main_window.follow_moved_path(source_path, dest_path)
+                self.main_window.invalidate_dir_listing(os.path.dirname(source_path))
+                self.main_window.invalidate_dir_listing(dest_dir)
                 self.main_window.load_notes_tree()
                 event.acceptProposedAction()
         else:
@@ -733,20 +1301,32 @@ class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.current_note_path = None
+        self._current_theme_name = None
+        self._dir_cache = {}
+        self._tree_items = {}
+        self._note_infos = {}
+        self._collapsed_paths = set()
+        self._ref_docx_cache = {}
+        self._export_worker = None
+        self._url_imports = {}
+        self._browser_worker = None
         self.config = self._load_app_config()
+        self.tr = make_tr(self.config.get('language', '中文'))
         self.note_manager = NoteManager(self.config['notes_dir'], self.config['images_dir'], self.config)
         self.requests_converter = RequestsConverter(self.config['images_dir'])
         self.selenium_manager = SeleniumManager(self.config)
         self.selenium_manager.main_window = self
+        self._fs_changed_dirs = set()
+        self._fs_timer = QTimer(self)
+        self._fs_timer.setSingleShot(True)
+        self._fs_timer.setInterval(500)
+        self._fs_timer.timeout.connect(self._apply_fs_changes)
+        self._fs_watcher = QFileSystemWatcher(self)
+        self._fs_watcher.directoryChanged.connect(self._on_notes_dir_changed)
         self.init_ui()
         self.apply_styles()
         self.load_notes_tree()
 
-    def tr(self, key, **kwargs):
-        lang = self.config.get('language', '中文')
-        template = TRANSLATIONS.get(key, {}).get(lang, TRANSLATIONS.get(key, {}).get('English', f"<{key}>"))
-        return template.format(**kwargs)
-
     def toggle_bold(self):
         cursor = self.note_editor.textCursor()
         if not cursor.hasSelection(): return
@@ -788,35 +1368,76 @@ class MainWindow(QMainWindow):
 
     def import_from_url(self, use_selenium=False):
         if not use_selenium:
-            url, ok = QInputDialog.getText(self, self.tr('import_url_dialog_title'), self.tr('import_url_dialog_label'))
-            if not (ok and url): return
+            text, ok = QInputDialog.getMultiLineText(self, self.tr('import_url_dialog_title'),
+                                                     self.tr('import_url_dialog_label'))
+            urls = list(dict.fromkeys(line.strip() for line in text.splitlines() if line.strip())) if ok else []
+            if not urls: return
             QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-            title, content, error = self.requests_converter.convert_from_url(url)
-            QApplication.restoreOverrideCursor()
-            if error:
-                QMessageBox.critical(self, self.tr('import_failed'), error)
-            else:
-                note_name = f"{title}.md";
-                parent_dir = self.get_selected_dir()
-                path = self.note_manager.create_item(parent_dir, note_name, content=content)
-                if not path:
-                    QMessageBox.warning(self, self.tr('error'), self.tr('same_name_exists'))
-                else:
-                    self.load_notes_tree();
-                    QMessageBox.information(self, self.tr('success'), self.tr('import_success', title=title))
+            worker = UrlImportWorker(self.requests_converter, urls, self.get_selected_dir(), self)
+            self._url_imports[worker] = ([], [])
+            worker.url_converted.connect(self.on_url_converted)
+            worker.finished.connect(self.on_url_import_finished)
+            worker.start()
         else:
             dialog = AdvancedImportDialog(self.selenium_manager, self)
             dialog.exec()
 
+    def on_url_converted(self, url, title, content, error):
+        worker = self.sender()
+        if worker not in self._url_imports: return
+        imported, failed = self._url_imports[worker]
+        if error:
+            failed.append(f"{url}: {error}")
+            return
+        path = self.note_manager.create_item(worker.parent_dir, f"{title}.md", content=content)
+        if not path:
+            failed.append(f"{url}: {self.tr('same_name_exists')}")
+        else:
+            imported.append(title)
+            self._insert_item(path)
+
+    def on_url_import_finished(self):
+        worker = self.sender()
+        worker.deleteLater()
+        if worker not in self._url_imports: return
+        imported, failed = self._url_imports.pop(worker)
+        QApplication.restoreOverrideCursor()
+        if failed:
+            QMessageBox.critical(self, self.tr('import_failed'), "\n".join(failed))
+        if len(imported) == 1:
+            QMessageBox.information(self, self.tr('success'), self.tr('import_success', title=imported[0]))
+        elif imported:
+            QMessageBox.information(self, self.tr('success'), self.tr('import_batch_success', count=len(imported)))
+
+    def browser_launch_worker(self):
+        # A dialog reopened mid-launch joins the running launch instead of racing it for the driver and profile.
+        if self._browser_worker is not None and self._browser_worker.isRunning(): return self._browser_worker
+        worker = self._browser_worker = BrowserLaunchWorker(self.selenium_manager, self)
+        worker.finished.connect(lambda: self._on_browser_worker_finished(worker))
+        return worker
+
+    def _on_browser_worker_finished(self, worker):
+        if self._browser_worker is worker: self._browser_worker = None
+        worker.deleteLater()
+
     def closeEvent(self, event):
+        if self._export_worker is not None:
+            self._export_worker.cancel()
+            self._export_worker.wait()
+        # The browser must be up (or have failed) before quit_browser, or a late launch leaves it orphaned.
+        if self._browser_worker is not None: self._browser_worker.wait()
+        url_workers = list(self._url_imports)
+        self._url_imports.clear()
+        for worker in url_workers: worker.cancel()
+        for worker in url_workers: worker.wait()
         self.selenium_manager.quit_browser()
         self.save_current_note(show_message=False)
+        self.note_manager.flush_metadata()
         event.accept()
 
     def _load_app_config(self):
         if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                config = json.load(f)
+            config = read_json(CONFIG_FILE)
         else:
             config = {}
 
@@ -824,7 +1445,8 @@ class MainWindow(QMainWindow):
             'notes_dir': DEFAULT_NOTES_DIR, 'images_dir': DEFAULT_IMAGES_DIR,
             'chinese_font': '宋体', 'english_font': 'Arial', 'theme': 'Default Light',
             'browser': 'Chrome', 'chrome_binary_path': '', 'edge_binary_path': '',
-            'bold_color': '#000000', 'language': '中文'
+            'bold_color': '#000000', 'language': '中文', 'pandoc_input_format': PANDOC_INPUT_FORMATS[0],
+            'pandoc_timeout': 60, 'pdf_engine': 'xelatex'
         }
 
         is_new_config = not os.path.exists(CONFIG_FILE)
@@ -838,7 +1460,7 @@ class MainWindow(QMainWindow):
         return config
 
     def _save_app_config(self, config):
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f: json.dump(config, f, ensure_ascii=False, indent=4)
+        write_json_atomic(CONFIG_FILE, config, fsync=True)
 
     def init_ui(self):
         self.setWindowTitle(self.tr('window_title'));
@@ -852,13 +1474,19 @@ class MainWindow(QMainWindow):
         import_selenium_action.triggered.connect(lambda: self.import_from_url(True))
         import_menu.addAction(import_action);
         import_menu.addAction(import_selenium_action)
-        export_menu = file_menu.addMenu(self.tr('export_as_menu'))
+        self.export_menu = file_menu.addMenu(self.tr('export_as_menu'))
         export_pdf_action = QAction("PDF", self);
         export_pdf_action.triggered.connect(lambda: self.export_note('pdf'))
         export_docx_action = QAction("Word (.docx)", self);
         export_docx_action.triggered.connect(lambda: self.export_note('docx'))
-        export_menu.addAction(export_pdf_action);
-        export_menu.addAction(export_docx_action)
+        export_md_action = QAction("Markdown (.md)", self);
+        export_md_action.triggered.connect(lambda: self.export_note('md'))
+        self.export_menu.addAction(export_pdf_action);
+        self.export_menu.addAction(export_docx_action)
+        self.export_menu.addAction(export_md_action)
+        self.cancel_export_action = file_menu.addAction(self.tr('cancel_export'))
+        self.cancel_export_action.setEnabled(False)
+        self.cancel_export_action.triggered.connect(self.cancel_export)
         settings_menu = menubar.addMenu(self.tr('settings_menu'))
         set_img_dir_action = QAction(self.tr('set_image_folder'), self);
         set_img_dir_action.triggered.connect(self.set_image_directory)
@@ -911,6 +1539,26 @@ class MainWindow(QMainWindow):
         else:
             zh_action.setChecked(True)
 
+        input_format_menu = settings_menu.addMenu(self.tr('pandoc_input_format_menu'))
+        input_format_group = QActionGroup(self)
+        input_format_group.setExclusive(True)
+        for input_format in PANDOC_INPUT_FORMATS:
+            format_action = QAction(input_format, self, checkable=True)
+            format_action.triggered.connect(lambda checked, fmt=input_format: self.set_pandoc_input_format(fmt))
+            if self.config.get('pandoc_input_format') == input_format: format_action.setChecked(True)
+            input_format_group.addAction(format_action)
+            input_format_menu.addAction(format_action)
+
+        pdf_engine_menu = settings_menu.addMenu(self.tr('pdf_engine_menu'))
+        pdf_engine_group = QActionGroup(self)
+        pdf_engine_group.setExclusive(True)
+        for engine in PDF_ENGINES:
+            engine_action = QAction(engine, self, checkable=True)
+            engine_action.triggered.connect(lambda checked, eng=engine: self.set_pdf_engine(eng))
+            if self.config.get('pdf_engine') == engine: engine_action.setChecked(True)
+            pdf_engine_group.addAction(engine_action)
+            pdf_engine_menu.addAction(engine_action)
+
         settings_menu.addActions([set_img_dir_action, set_font_action, set_bold_color_action, set_browser_path_action])
 
         central_widget = QWidget();
@@ -922,12 +1570,16 @@ class MainWindow(QMainWindow):
         filter_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText(self.tr('search_placeholder'))
-        self.search_input.textChanged.connect(self.load_notes_tree)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.apply_filter_and_sort)
+        self.search_input.textChanged.connect(self._search_timer.start)
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(
             [self.tr('filter_all_notes'), self.tr('filter_favorites_only'), self.tr('filter_by_title'),
              self.tr('filter_by_summary')])
-        self.filter_combo.currentIndexChanged.connect(self.load_notes_tree)
+        self.filter_combo.currentIndexChanged.connect(self.apply_filter_and_sort)
         filter_layout.addWidget(self.search_input)
         filter_layout.addWidget(self.filter_combo)
         left_layout.addLayout(filter_layout)
@@ -937,11 +1589,18 @@ class MainWindow(QMainWindow):
         self.sort_combo.addItems(
             [self.tr('sort_mod_desc'), self.tr('sort_mod_asc'), self.tr('sort_cre_desc'), self.tr('sort_cre_asc'),
              self.tr('sort_name_asc'), self.tr('sort_name_desc')])
-        self.sort_combo.currentIndexChanged.connect(self.load_notes_tree)
+        self.sort_combo.currentIndexChanged.connect(self.apply_filter_and_sort)
         sort_layout.addWidget(self.sort_combo);
         left_layout.addLayout(sort_layout)
         self.notes_tree_widget = DraggableTreeWidget(note_manager=self.note_manager, main_window=self)
         self.notes_tree_widget.setHeaderHidden(True);
+        self._folder_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
+        self.note_delegate = NoteItemDelegate(self.notes_tree_widget)
+        self.notes_tree_widget.setItemDelegate(self.note_delegate)
+        self.notes_tree_widget.itemExpanded.connect(
+            lambda item: self._collapsed_paths.discard(item.data(0, Qt.ItemDataRole.UserRole)))
+        self.notes_tree_widget.itemCollapsed.connect(
+            lambda item: self._collapsed_paths.add(item.data(0, Qt.ItemDataRole.UserRole)))
         self.notes_tree_widget.itemClicked.connect(self.on_note_selected)
         self.notes_tree_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.notes_tree_widget.customContextMenuRequested.connect(self.show_tree_context_menu)
@@ -950,11 +1609,27 @@ class MainWindow(QMainWindow):
         editor_panel = QFrame();
         editor_layout = QVBoxLayout(editor_panel)
         self.note_editor = QTextEdit()
-        self.note_editor.document().contentsChanged.connect(self.update_preview)
+        self._last_preview_key = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(250)
+        self._preview_timer.timeout.connect(self.update_preview)
+        self.note_editor.document().contentsChanged.connect(self._preview_timer.start)
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(2000)
+        self._save_timer.timeout.connect(lambda: self.save_current_note(show_message=False, fsync=False))
+        self.note_editor.document().contentsChanged.connect(self._save_timer.start)
         editor_layout.addWidget(self.note_editor)
         preview_panel = QFrame();
         preview_layout = QVBoxLayout(preview_panel)
         self.preview_area = QWebEngineView();
+        self._preview_style_key = None
+        self._preview_loaded = False
+        self._preview_expect_load = False
+        self._pending_preview_body = None
+        self.preview_area.loadStarted.connect(self._on_preview_load_started)
+        self.preview_area.loadFinished.connect(self._on_preview_loaded)
         preview_layout.addWidget(self.preview_area)
         right_splitter.addWidget(editor_panel);
         right_splitter.addWidget(preview_panel);
@@ -972,13 +1647,15 @@ class MainWindow(QMainWindow):
 
     def apply_styles(self):
         theme_name = self.config.get('theme', 'Default Light')
-        theme_data = THEMES.get(theme_name, THEMES['Default Light'])
-        stylesheet = theme_data.get("style", "")
         eng_font = self.config.get('english_font', 'Arial')
         cn_font = self.config.get('chinese_font', '宋体')
         app_font = QFont(eng_font)
         QApplication.instance().setFont(app_font)
-        self.setStyleSheet(stylesheet)
+        if theme_name != self._current_theme_name:
+            self.setStyleSheet(THEME_STYLES.get(theme_name, THEME_STYLES['Default Light']))
+            self.note_delegate.theme = THEMES.get(theme_name, THEMES['Default Light'])
+            self.notes_tree_widget.viewport().update()
+            self._current_theme_name = theme_name
         self.note_editor.setFont(QFont(cn_font, 12))
         self.update_preview()
 
@@ -992,6 +1669,8 @@ class MainWindow(QMainWindow):
             return
         self.config['language'] = lang
         self._save_app_config(self.config)
+        self.tr = make_tr(lang)
+        self.note_manager.tr = self.selenium_manager.tr = self.tr
         QMessageBox.information(self, self.tr('language_changed_title'), self.tr('restart_to_apply'))
 
     def set_browser(self, browser_name):
@@ -999,94 +1678,211 @@ class MainWindow(QMainWindow):
         self._save_app_config(self.config)
         self.selenium_manager.config['browser'] = browser_name
 
+    def set_pandoc_input_format(self, input_format):
+        self.config['pandoc_input_format'] = input_format
+        self._save_app_config(self.config)
+
+    def set_pdf_engine(self, engine):
+        self.config['pdf_engine'] = engine
+        self._save_app_config(self.config)
+
     def load_notes_tree(self):
+        current_item = self.notes_tree_widget.currentItem()
+        current_path = current_item.data(0, Qt.ItemDataRole.UserRole) if current_item else None
+        self.notes_tree_widget.setUpdatesEnabled(False)
         self.notes_tree_widget.clear()
+        self._tree_items = {}
+        self._note_infos = {}
         self._populate_tree(self.notes_tree_widget, self.note_manager.notes_dir)
-        self.notes_tree_widget.expandAll()
+        current_item = self._tree_items.get(current_path) or self._tree_items.get(self.current_note_path)
+        if current_item: self.notes_tree_widget.setCurrentItem(current_item)
+        self.notes_tree_widget.setUpdatesEnabled(True)
+        self._sync_watched_dirs()
+        self.apply_filter_and_sort()
+
+    def _sync_watched_dirs(self):
+        wanted = {p for p in self._tree_items if p not in self._note_infos}
+        wanted.add(self.note_manager.notes_dir)
+        watched = set(self._fs_watcher.directories())
+        if watched - wanted: self._fs_watcher.removePaths(list(watched - wanted))
+        if wanted - watched: self._fs_watcher.addPaths(list(wanted - watched))
+
+    def _on_notes_dir_changed(self, path):
+        self.invalidate_dir_listing(path)
+        self._fs_changed_dirs.add(path)
+        if not self._fs_timer.isActive(): self._fs_timer.start()
+
+    def _apply_fs_changes(self):
+        changed, self._fs_changed_dirs = self._fs_changed_dirs, set()
+        if any(self._dir_differs(path) for path in changed): self.load_notes_tree()
+
+    def _dir_differs(self, path):
+        is_root = path == self.note_manager.notes_dir
+        parent = self.notes_tree_widget.invisibleRootItem() if is_root else self._tree_items.get(path)
+        if not os.path.isdir(path): return parent is not None
+        if parent is None: return False
+        shown = {parent.child(i).data(0, Qt.ItemDataRole.UserRole) for i in range(parent.childCount())}
+        folders, files = self._scan_dir(path)
+        on_disk = {f"{path}{_SEP}{name}" for name in folders if name not in SKIPPED_FOLDERS}
+        on_disk.update(entry.path for entry in files)
+        return shown != on_disk
+
+    def _scan_dir(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._dir_cache.get(path)
+        if cached and cached[0] == mtime and cached[3] - mtime > DIR_MTIME_RACY_NS: return cached[1], cached[2]
+        scanned_at = time.time_ns()
+        with os.scandir(path) as it:
+            entries = [e for e in it if not e.name.startswith('.')]
+        folders = sorted(e.name for e in entries if e.is_dir())
+        # Only the app's own atomic-write temps (metadata.json.tmp, <note>.tmp) are hidden, not every *.tmp file.
+        names = {e.name for e in entries}
+        files = [e for e in entries if e.is_file() and e.name not in ('metadata.json', 'metadata.json.tmp')
+                 and not (e.name.endswith('.tmp') and e.name[:-4] in names)]
+        self._dir_cache[path] = (mtime, folders, files, scanned_at)
+        return folders, files
+
+    def invalidate_dir_listing(self, path):
+        self._dir_cache.pop(path, None)
 
     def _populate_tree(self, parent_item, path):
-        items = os.listdir(path)
-        folders = sorted([i for i in items if os.path.isdir(os.path.join(path, i)) and not i.startswith('.')])
-        files = [i for i in items if
-                 os.path.isfile(os.path.join(path, i)) and not i.startswith('.') and i != 'metadata.json']
-
+        folders, files = self._scan_dir(path)
+        for folder_name in folders:
+            if folder_name in SKIPPED_FOLDERS: continue
+            self._add_folder_item(parent_item, f"{path}{_SEP}{folder_name}")
+        for entry, info in zip(files, self.note_manager.get_dir_metadata(path, files)):
+            self._add_note_item(parent_item, entry.path, info)
+
+    def _add_folder_item(self, parent_item, folder_path):
+        folder_name = os.path.basename(folder_path)
+        folder_item = NoteTreeItem(parent_item, [folder_name])
+        folder_item.sort_rank = (0, folder_name)
+        folder_item.setData(0, Qt.ItemDataRole.UserRole, folder_path)
+        folder_item.setIcon(0, self._folder_icon)
+        folder_item.setFlags(folder_item.flags() & ~Qt.ItemFlag.ItemIsDragEnabled)
+        self._tree_items[folder_path] = folder_item
+        self._populate_tree(folder_item, folder_path)
+        folder_item.setExpanded(folder_path not in self._collapsed_paths)
+
+    def _add_note_item(self, parent_item, path, info):
+        info['name'] = os.path.basename(path)
+        info['name_key'] = info['name'].lower()
+        info['path'] = path
+        item = NoteTreeItem(parent_item)
+        item.setData(0, Qt.ItemDataRole.UserRole, path)
+        item.setData(0, NOTE_DISPLAY_ROLE, NoteItemDelegate.display_texts(path, info, self.tr))
+        self._tree_items[path] = item
+        self._note_infos[path] = info
+
+    def _refresh_item(self, path):
+        item = self._tree_items.get(path)
+        if item is None:
+            self.load_notes_tree()
+            return
+        info = self.note_manager.get_item_metadata(path)
+        info['name'] = os.path.basename(path)
+        info['name_key'] = info['name'].lower()
+        info['path'] = path
+        self._note_infos[path] = info
+        item.setData(0, NOTE_DISPLAY_ROLE, NoteItemDelegate.display_texts(path, info, self.tr))
+        self.apply_filter_and_sort()
+
+    def _insert_item(self, path):
+        parent_dir = os.path.dirname(path)
+        self.invalidate_dir_listing(parent_dir)
+        parent_item = self.notes_tree_widget if parent_dir == self.note_manager.notes_dir else self._tree_items.get(parent_dir)
+        if parent_item is None:
+            self.load_notes_tree()
+            return
+        if os.path.isdir(path):
+            if os.path.basename(path) not in SKIPPED_FOLDERS: self._add_folder_item(parent_item, path)
+        else:
+            self._add_note_item(parent_item, path, self.note_manager.get_item_metadata(path))
+        self._sync_watched_dirs()
+        self.apply_filter_and_sort()
+
+    def _remove_item(self, path):
+        self.invalidate_dir_listing(os.path.dirname(path))
+        item = self._tree_items.get(path)
+        if item is None: return
+        prefix = path + _SEP
+        for p in [p for p in self._tree_items if p == path or p.startswith(prefix)]:
+            del self._tree_items[p]
+            self._note_infos.pop(p, None)
+        parent = item.parent()
+        if parent is None:
+            self.notes_tree_widget.takeTopLevelItem(self.notes_tree_widget.indexOfTopLevelItem(item))
+        else:
+            parent.removeChild(item)
+        self._sync_watched_dirs()
+
+    def _note_matches(self, info, search_text, current_filter_key):
+        if current_filter_key == "filter_favorites_only" and not info.get('is_favorite', False):
+            return False
+        if search_text:
+            if current_filter_key in ["filter_all_notes", "filter_favorites_only", "filter_by_title"]:
+                if search_text in info['name_key']: return True
+            if current_filter_key in ["filter_all_notes", "filter_favorites_only", "filter_by_summary"]:
+                if search_text in info.get('summary', '').lower(): return True
+            return False
+        return True
+
+    def apply_filter_and_sort(self):
         search_text = self.search_input.text().lower()
         filter_index = self.filter_combo.currentIndex()
         filter_options = ['filter_all_notes', 'filter_favorites_only', 'filter_by_title', 'filter_by_summary']
         current_filter_key = filter_options[filter_index]
 
-        file_infos = []
-        for f in files:
-            full_path = os.path.join(path, f)
-            meta = self.note_manager.get_item_metadata(full_path)
-            meta['name'] = f
-            meta['path'] = full_path
-            file_infos.append(meta)
-
+        self.notes_tree_widget.setUpdatesEnabled(False)
         filtered_infos = []
-        is_all_notes_search = current_filter_key in ['filter_all_notes', 'filter_favorites_only']
-        if not search_text and current_filter_key == "filter_all_notes":
-            filtered_infos = file_infos
-        else:
-            for info in file_infos:
-                if current_filter_key == "filter_favorites_only" and not info.get('is_favorite', False):
-                    continue
-                if search_text:
-                    match = False
-                    if current_filter_key in ["filter_all_notes", "filter_favorites_only", "filter_by_title"]:
-                        if search_text in info['name'].lower(): match = True
-                    if not match and current_filter_key in ["filter_all_notes", "filter_favorites_only",
-                                                            "filter_by_summary"]:
-                        if search_text in info.get('summary', '').lower(): match = True
-                    if not match: continue
-                filtered_infos.append(info)
+        for info in self._note_infos.values():
+            matches = self._note_matches(info, search_text, current_filter_key)
+            self._tree_items[info['path']].setHidden(not matches)
+            if matches: filtered_infos.append(info)
 
         sort_index = self.sort_combo.currentIndex()
         sort_keys = ['sort_mod_desc', 'sort_mod_asc', 'sort_cre_desc', 'sort_cre_asc', 'sort_name_asc',
                      'sort_name_desc']
         sort_map = {"sort_mod_desc": ('modified_at', True), "sort_mod_asc": ('modified_at', False),
                     "sort_cre_desc": ('created_at', True), "sort_cre_asc": ('created_at', False),
-                    "sort_name_asc": ('name', False), "sort_name_desc": ('name', True)}
+                    "sort_name_asc": ('name_key', False), "sort_name_desc": ('name_key', True)}
         sort_key, reverse = sort_map.get(sort_keys[sort_index], ('modified_at', True))
-        if sort_key != 'name':
-            filtered_infos.sort(key=lambda x: x.get(sort_key, ''), reverse=reverse)
-        else:
-            filtered_infos.sort(key=lambda x: x['name'], reverse=reverse)
-        filtered_infos.sort(key=lambda x: x.get('is_pinned', False), reverse=True)
+        pinned = [info for info in filtered_infos if info['is_pinned']]
+        unpinned = [info for info in filtered_infos if not info['is_pinned']]
+        pinned.sort(key=itemgetter(sort_key), reverse=reverse)
+        unpinned.sort(key=itemgetter(sort_key), reverse=reverse)
+        filtered_infos = pinned + unpinned
 
-        for folder_name in folders:
-            if folder_name in ["images", "app_edge_profile", "app_chrome_profile", "drivers"]: continue
-            folder_path = os.path.join(path, folder_name);
-            folder_item = QTreeWidgetItem(parent_item, [folder_name])
-            folder_item.setData(0, Qt.ItemDataRole.UserRole, folder_path)
-            folder_item.setIcon(0, QIcon(self.style().standardIcon(self.style().StandardPixmap.SP_DirIcon)))
-            folder_item.setFlags(folder_item.flags() & ~Qt.ItemFlag.ItemIsDragEnabled)
-            self._populate_tree(folder_item, folder_path)
-        for info in filtered_infos:
-            item = QTreeWidgetItem(parent_item);
-            item.setData(0, Qt.ItemDataRole.UserRole, info['path'])
-            item_widget = NoteItemWidget(info['path'], info, self.tr)
-            self.notes_tree_widget.setItemWidget(item, 0, item_widget);
-            item.setSizeHint(0, item_widget.sizeHint())
+        for rank, info in enumerate(filtered_infos):
+            self._tree_items[info['path']].sort_rank = (1, rank)
+        self.notes_tree_widget.sortItems(0, Qt.SortOrder.AscendingOrder)
+        self.notes_tree_widget.setUpdatesEnabled(True)
 
     def on_note_selected(self, item, column):
         path = item.data(0, Qt.ItemDataRole.UserRole)
         if path and os.path.isfile(path):
             if self.current_note_path and self.note_editor.document().isModified():
-                self.save_current_note(show_message=False)
+                self.save_current_note(show_message=False, fsync=False)
             self.current_note_path = path
             content = self.note_manager.get_note_content(path)
             self.note_editor.setText(content)
             self.note_editor.document().setModified(False)
+            self._preview_timer.stop()
+            self._save_timer.stop()
             self.update_preview()
 
     def update_preview(self):
         if not hasattr(self, 'note_manager'): return
-        markdown_text = self.note_editor.toPlainText()
+        # With no note open the editor content is never saved, so the preview stays on the empty page.
+        revision = self.note_editor.document().revision() if self.current_note_path is not None else -1
         eng_font = self.config.get('english_font', 'Arial')
         cn_font = self.config.get('chinese_font', '宋体')
         theme_name = self.config.get('theme', 'Default Light')
         bold_color = self.config.get('bold_color', '#000000')
+        preview_key = (revision, theme_name, eng_font, cn_font, bold_color)
+        if preview_key == self._last_preview_key: return
+        self._last_preview_key = preview_key
+        markdown_text = self.note_editor.toPlainText() if revision != -1 else ''
         bold_style = f"<style>strong, b {{ color: {bold_color} !important; }}</style>"
         theme_css = ""
         if theme_name == "Dark":
@@ -1096,23 +1892,81 @@ class MainWindow(QMainWindow):
         elif theme_name == "Newspaper":
             theme_css = "<style>body { background-color: #faf0e0; color: #333; }</style>"
         font_style = f"<style>body {{ font-family: '{eng_font}', '{cn_font}'; font-size: 16px; }}</style>"
-        html = theme_css + font_style + bold_style + markdown.markdown(markdown_text,
-                                                                       extensions=['fenced_code', 'tables'])
-        base_url = QUrl.fromLocalFile(os.path.abspath(self.note_manager.notes_dir) + os.path.sep)
-        self.preview_area.setHtml(html, baseUrl=base_url)
+        body_html = render_markdown(markdown_text)
+        style_key = preview_key[1:] + (self.note_manager.notes_dir,)
+        if style_key != self._preview_style_key:
+            self._preview_style_key = style_key
+            self._preview_loaded = False
+            self._preview_expect_load = True
+            self._pending_preview_body = None
+            html = f"<html><head>{theme_css}{font_style}{bold_style}</head><body>{body_html}</body></html>"
+            base_url = QUrl.fromLocalFile(os.path.abspath(self.note_manager.notes_dir) + os.path.sep)
+            self.preview_area.setHtml(html, baseUrl=base_url)
+        elif not self._preview_loaded:
+            self._pending_preview_body = body_html
+        else:
+            self._set_preview_body(body_html)
+
+    def _set_preview_body(self, body_html):
+        self.preview_area.page().runJavaScript(f"document.body.innerHTML = {json.dumps(body_html)};")
 
-    def save_current_note(self, show_message=True):
+    def _on_preview_load_started(self):
+        if self._preview_expect_load:
+            self._preview_expect_load = False
+        else:
+            # The user followed a link away from the preview page; the next update reloads it.
+            self._preview_style_key = None
+            self._preview_loaded = False
+
+    def _on_preview_loaded(self, ok):
+        if not ok:
+            self._preview_style_key = None
+            return
+        if self._preview_style_key is None: return
+        self._preview_loaded = True
+        if self._pending_preview_body is not None:
+            self._set_preview_body(self._pending_preview_body)
+            self._pending_preview_body = None
+
+    def save_current_note(self, show_message=True, fsync=True):
+        self._save_timer.stop()
         if self.current_note_path and self.note_editor.document().isModified():
             content = self.note_editor.toPlainText()
-            self.note_manager.save_note(self.current_note_path, content)
+            self.note_manager.save_note(self.current_note_path, content, fsync=fsync)
             self.note_editor.document().setModified(False)
-            self.load_notes_tree()
+            self._refresh_item(self.current_note_path)
             if show_message:
                 QMessageBox.information(self, self.tr('success'), self.tr('note_saved_success',
                                                                           note_name=os.path.basename(
                                                                               self.current_note_path)))
 
-    def _create_reference_docx(self, filepath):
+    def _get_reference_docx(self):
+        key = (self.config.get('chinese_font', '宋体'), self.config.get('english_font', 'Arial'))
+        path = self._ref_docx_cache.get(key)
+        if path is None or not os.path.exists(path):
+            digest = hashlib.blake2b('\0'.join(key).encode('utf-8'), digest_size=8).hexdigest()
+            path = os.path.abspath(os.path.join(REFERENCE_DOCX_DIR, f"reference_{digest}.docx"))
+            if not os.path.exists(path):
+                template_path = os.path.join(REFERENCE_DOCX_DIR, REFERENCE_TEMPLATE_DOCX)
+                if not os.path.exists(template_path) and not self._build_docx(template_path,
+                                                                              self._create_reference_template):
+                    return None
+                if not self._build_docx(path, lambda tmp_path: write_reference_docx(template_path, tmp_path, *key)):
+                    return None
+            self._ref_docx_cache[key] = path
+        return path
+
+    def _build_docx(self, path, build):
+        os.makedirs(REFERENCE_DOCX_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(suffix='.docx', dir=REFERENCE_DOCX_DIR)
+        os.close(fd)
+        if not build(tmp_path):
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, path)
+        return True
+
+    def _create_reference_template(self, filepath):
         try:
             from docx import Document
             from docx.shared import Pt
@@ -1120,12 +1974,13 @@ class MainWindow(QMainWindow):
         except ImportError:
             QMessageBox.critical(self, self.tr('error'),
                                  "python-docx library not found. Please install it via 'pip install python-docx'.")
-            return
+            return False
 
         document = Document()
 
-        cn_font = self.config.get('chinese_font', '宋体')
-        en_font = self.config.get('english_font', 'Arial')
+        # Font names are placeholders that write_reference_docx swaps for the configured pair.
+        cn_font = REFERENCE_CN_FONT_PLACEHOLDER
+        en_font = REFERENCE_EN_FONT_PLACEHOLDER
 
         # --- Style for Normal Text (正文) ---
         style = document.styles['Normal']
@@ -1154,41 +2009,88 @@ class MainWindow(QMainWindow):
                 print(f"Heading {i} style not found in base template, skipping.")
 
         document.save(filepath)
+        return True
 
     def export_note(self, format_type):
-        if not self.current_note_path:
+        # Several selected notes go to a single pandoc run, which concatenates its inputs into one document.
+        # Walk the tree rather than selectedItems() so notes come in display order and filtered-out ones are skipped.
+        flags = QTreeWidgetItemIterator.IteratorFlag.Selected | QTreeWidgetItemIterator.IteratorFlag.NotHidden
+        it = QTreeWidgetItemIterator(self.notes_tree_widget, flags)
+        source_paths = []
+        while it.value():
+            path = it.value().data(0, Qt.ItemDataRole.UserRole)
+            if path in self._note_infos: source_paths.append(path)
+            it += 1
+        if len(source_paths) < 2: source_paths = [self.current_note_path] if self.current_note_path else []
+        if not source_paths:
             QMessageBox.warning(self, self.tr('tip'), self.tr('export_select_note_prompt'));
             return
 
-        self.save_current_note(show_message=False)
-        default_filename = os.path.splitext(os.path.basename(self.current_note_path))[0] + f".{format_type}"
+        self.save_current_note(show_message=False, fsync=False)
+        default_filename = os.path.splitext(os.path.basename(source_paths[0]))[0] + f".{format_type}"
         save_path, _ = QFileDialog.getSaveFileName(self, self.tr('export_to', format=format_type.upper()),
                                                    default_filename,
                                                    f"{self.tr('export_file_type', format=format_type.upper())} (*.{format_type});;{self.tr('all_files')} (*)")
 
         if save_path:
-            ref_docx_path = None
+            if not save_path.lower().endswith(f".{format_type}"): save_path += f".{format_type}"
+            # Notes are stored as Markdown text, so a Markdown or same-extension export is a plain copy.
+            if format_type == 'md' or (len(source_paths) == 1 and
+                                       os.path.splitext(source_paths[0])[1].lower() == f".{format_type}"):
+                try:
+                    if len(source_paths) == 1:
+                        shutil.copyfile(source_paths[0], save_path)
+                    else:
+                        with open(save_path, 'wb') as out:
+                            for i, path in enumerate(source_paths):
+                                if i: out.write(b'\n\n')
+                                with open(path, 'rb') as f: shutil.copyfileobj(f, out)
+                except OSError as e:
+                    QMessageBox.critical(self, self.tr('export_failed'), str(e))
+                    return
+                QMessageBox.information(self, self.tr('success'), self.tr('export_success', path=save_path))
+                return
+            to_format = format_type
             try:
                 extra_args = [f'--resource-path={self.note_manager.notes_dir}']
 
                 if format_type == 'docx':
-                    ref_docx_path = os.path.join(os.getcwd(), "temp_reference_for_export.docx")
-                    self._create_reference_docx(ref_docx_path)
-                    extra_args.append(f'--reference-doc={ref_docx_path}')
+                    ref_docx_path = self._get_reference_docx()
+                    if ref_docx_path: extra_args.append(f'--reference-doc={ref_docx_path}')
 
                 elif format_type == 'pdf':
-                    extra_args.extend(['--pdf-engine=xelatex', '-V', f'mainfont={self.config["chinese_font"]}'])
-
-                pypandoc.convert_file(self.current_note_path, format_type, outputfile=save_path, extra_args=extra_args)
-                QMessageBox.information(self, self.tr('success'), self.tr('export_success', path=save_path))
+                    # pandoc renders PDF through the engine's input writer and picks PDF output from the .pdf extension.
+                    engine = self.config.get('pdf_engine', 'xelatex')
+                    to_format = PDF_ENGINES.get(engine, 'latex')
+                    extra_args.extend([f'--pdf-engine={engine}', '-V', f'mainfont={self.config["chinese_font"]}'])
             except Exception as e:
                 QMessageBox.critical(self, self.tr('export_failed'), self.tr('export_pandoc_error', e=e))
-            finally:
-                if ref_docx_path and os.path.exists(ref_docx_path):
-                    try:
-                        os.remove(ref_docx_path)
-                    except OSError as e:
-                        print(f"Error removing temporary reference docx: {e}")
+                return
+            self.export_menu.setEnabled(False)
+            self.cancel_export_action.setEnabled(True)
+            self._export_worker = ExportWorker(source_paths, self.config['pandoc_input_format'], to_format,
+                                               save_path, extra_args, self.config['pandoc_timeout'], self)
+            self._export_worker.export_finished.connect(self.on_export_finished)
+            self._export_worker.finished.connect(self._export_worker.deleteLater)
+            self._export_worker.start()
+
+    def cancel_export(self):
+        if self._export_worker is not None: self._export_worker.cancel()
+
+    def on_export_finished(self, save_path, error):
+        self._export_worker = None
+        self.export_menu.setEnabled(True)
+        self.cancel_export_action.setEnabled(False)
+        if isinstance(error, ExportCancelled):
+            return
+        if isinstance(error, subprocess.TimeoutExpired):
+            QMessageBox.critical(self, self.tr('export_failed'), self.tr('export_timeout', timeout=error.timeout))
+        elif isinstance(error, ImportError):
+            QMessageBox.critical(self, self.tr('export_failed'), self.tr('missing_dependency', module=error.name))
+        elif error:
+            QMessageBox.critical(self, self.tr('export_failed'), self.tr('export_pandoc_error', e=error))
+        else:
+            QMessageBox.information(self, self.tr('success'), self.tr('export_success', path=save_path))
 
     def set_image_directory(self):
         dir_name = QFileDialog.getExistingDirectory(self, self.tr('select_image_folder_title'),
@@ -1229,62 +2131,87 @@ class MainWindow(QMainWindow):
     def show_tree_context_menu(self, pos):
         item = self.notes_tree_widget.itemAt(pos);
         menu = QMenu()
-        new_note_action = menu.addAction(self.tr('new_note'));
-        new_folder_action = menu.addAction(self.tr('new_folder'))
+        handlers = {menu.addAction(self.tr('new_note')): lambda: self.new_note(self.get_selected_dir()),
+                    menu.addAction(self.tr('new_folder')): lambda: self.new_folder(self.get_selected_dir())}
         if item:
             menu.addSeparator()
             path = item.data(0, Qt.ItemDataRole.UserRole)
             if path and os.path.isfile(path):
-                meta = self.note_manager.get_item_metadata(path)
+                meta = self._meta(path)
                 pin_text = self.tr('unpin') if meta.get('is_pinned') else self.tr('pin_to_top')
                 fav_text = self.tr('unfavorite') if meta.get('is_favorite') else self.tr('add_to_favorites')
-                pin_action = menu.addAction(pin_text);
-                fav_action = menu.addAction(fav_text)
-                edit_summary_action = menu.addAction(self.tr('edit_summary'))
+                handlers[menu.addAction(pin_text)] = lambda: self.toggle_pinned(path)
+                handlers[menu.addAction(fav_text)] = lambda: self.toggle_favorite(path)
+                handlers[menu.addAction(self.tr('edit_summary'))] = lambda: self.edit_summary(path)
             if path:
-                rename_action = menu.addAction(self.tr('rename'));
-                delete_action = menu.addAction(self.tr('delete'))
-        action = menu.exec(self.notes_tree_widget.mapToGlobal(pos));
-        parent_dir = self.get_selected_dir()
-        if action == new_note_action:
-            name, ok = QInputDialog.getText(self, self.tr('new_note'), self.tr('enter_note_name'))
-            if ok and name: self.note_manager.create_item(parent_dir, f"{name}.md"); self.load_notes_tree()
-        elif action == new_folder_action:
-            name, ok = QInputDialog.getText(self, self.tr('new_folder'), self.tr('enter_folder_name'))
-            if ok and name: self.note_manager.create_item(parent_dir, name, is_folder=True); self.load_notes_tree()
-        elif item and 'rename_action' in locals() and action == rename_action:
-            old_name = os.path.basename(path);
-            new_name, ok = QInputDialog.getText(self, self.tr('rename'), self.tr('enter_new_name'), text=old_name)
-            if ok and new_name != old_name:
-                _, error = self.note_manager.rename_item(path, new_name)
-                if error:
-                    QMessageBox.warning(self, self.tr('error'), error)
-                else:
-                    self.load_notes_tree()
-        elif item and 'delete_action' in locals() and action == delete_action:
-            reply = QMessageBox.question(self, self.tr('confirm_delete'),
-                                         self.tr('confirm_delete_message', item_name=os.path.basename(path)),
-                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
-                                         QMessageBox.StandardButton.No)
-            if reply == QMessageBox.StandardButton.Yes:
-                self.note_manager.delete_item(path)
-                if path == self.current_note_path: self.current_note_path = None; self.note_editor.clear(); self.preview_area.setHtml(
-                    "")
-                self.load_notes_tree()
-        elif item and 'pin_action' in locals() and action == pin_action:
-            self.note_manager.toggle_pinned(path);
-            self.load_notes_tree()
-        elif item and 'fav_action' in locals() and action == fav_action:
-            self.note_manager.toggle_favorite(path);
-            self.load_notes_tree()
-        elif item and 'edit_summary_action' in locals() and action == edit_summary_action:
-            self.edit_summary(path)
+                handlers[menu.addAction(self.tr('rename'))] = lambda: self.rename_tree_item(path)
+                handlers[menu.addAction(self.tr('delete'))] = lambda: self.delete_tree_item(path)
+        handler = handlers.get(menu.exec(self.notes_tree_widget.mapToGlobal(pos)))
+        if handler: handler()
+
+    def new_note(self, parent_dir):
+        name, ok = QInputDialog.getText(self, self.tr('new_note'), self.tr('enter_note_name'))
+        if ok and name:
+            new_path = self.note_manager.create_item(parent_dir, f"{name}.md")
+            if new_path: self._insert_item(new_path)
+
+    def new_folder(self, parent_dir):
+        name, ok = QInputDialog.getText(self, self.tr('new_folder'), self.tr('enter_folder_name'))
+        if ok and name:
+            new_path = self.note_manager.create_item(parent_dir, name, is_folder=True)
+            if new_path: self._insert_item(new_path)
+
+    def rename_tree_item(self, path):
+        old_name = os.path.basename(path);
+        new_name, ok = QInputDialog.getText(self, self.tr('rename'), self.tr('enter_new_name'), text=old_name)
+        if ok and new_name != old_name:
+            new_path, error = self.note_manager.rename_item(path, new_name)
+            if error:
+                QMessageBox.warning(self, self.tr('error'), error)
+            else:
+                self.follow_moved_path(path, new_path)
+                self._remove_item(path)
+                self._insert_item(new_path)
+
+    def delete_tree_item(self, path):
+        reply = QMessageBox.question(self, self.tr('confirm_delete'),
+                                     self.tr('confirm_delete_message', item_name=os.path.basename(path)),
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                                     QMessageBox.StandardButton.No)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.note_manager.delete_item(path)
+            current = self.current_note_path
+            if current and (current == path or current.startswith(path + _SEP)):
+                self._save_timer.stop()
+                self.current_note_path = None
+                self.note_editor.clear()
+                self.preview_area.setHtml("")
+                self._last_preview_key = None
+                self._preview_style_key = None
+            self._remove_item(path)
+
+    def toggle_pinned(self, path):
+        self.note_manager.toggle_pinned(path)
+        self._refresh_item(path)
+
+    def toggle_favorite(self, path):
+        self.note_manager.toggle_favorite(path)
+        self._refresh_item(path)
+
+    def follow_moved_path(self, old_path, new_path):
+        current = self.current_note_path
+        if current and (current == old_path or current.startswith(old_path + _SEP)):
+            self.current_note_path = new_path + current[len(old_path):]
+
+    def _meta(self, path):
+        info = self._note_infos.get(path)
+        return info if info is not None else self.note_manager.get_item_metadata(path)
 
     def edit_summary(self, path):
-        meta = self.note_manager.get_item_metadata(path)
+        meta = self._meta(path)
         new_summary, ok = QInputDialog.getMultiLineText(self, self.tr('edit_summary'), self.tr('enter_summary'),
                                                         text=meta.get('summary', ''))
-        if ok: self.note_manager.update_summary(path, new_summary); self.load_notes_tree()
+        if ok: self.note_manager.update_summary(path, new_summary); self._refresh_item(path)
 
 
 if __name__ == '__main__':